@@ -1,56 +1,95 @@
 from mesa import Agent
 
+from selection import by_priority
+
 class UserAgent(Agent):
+    """Social media user; the base class also serves as the normal agent.
+
+    Per-agent state lives in __slots__ and per-type constants are class
+    attributes, so each agent only stores what its type actually uses.
+    Calling UserAgent(..., agent_type=...) returns the matching subclass from
+    AGENT_CLASSES.
+    """
+
+    __slots__ = (
+        "_tallied", "agent_type", "_critical_thinking", "_believes_misinformation",
+        "belief", "_influence_count", "correction_count",
+    )
+
+    def __new__(cls, unique_id=None, model=None, agent_type="normal", *args, **kwargs):
+        if cls is UserAgent:
+            cls = AGENT_CLASSES.get(agent_type, UserAgent)
+        return super().__new__(cls)
+
     def __init__(self, unique_id, model, agent_type="normal", critical_thinking=None, misinformation=False):
         super().__init__(unique_id, model)
+        self._tallied = False  # Set once the model's tallies track this agent
         self.agent_type = agent_type
-        self.critical_thinking = critical_thinking if critical_thinking is not None else model.random.random()
-        self.believes_misinformation = misinformation
+        # Untracked and unplaced, so the setters would have nothing to report
+        self._critical_thinking = critical_thinking if critical_thinking is not None else model.random.random()
+        self._believes_misinformation = misinformation
         self.belief = "misinformed" if misinformation else "informed"
-        self.influence_count = 0
+        self._influence_count = 0
         self.correction_count = 0  # Track corrections made by fact checkers
-        
-        
-        
-        if agent_type == "fact_checker":
-            self.critical_thinking = 1.0
-            self.believes_misinformation = False
-            self.belief = "informed"
-            self.correction_strength = 0.95 
-            self.search_radius = 3  
-            self.correction_attempts = 0
-            self.successful_corrections = 0
-            self.correction_cooldown = 0
-            self.movement_speed = 1  
-            self.last_position = None  # Track last position for movement
-        elif agent_type == "influencer":
-
-
-            self.influence_radius = 3  
-            self.influence_strength = 0.9  
-            self.influence_count = 0
-            self.movement_speed = 2
-            self.influence_decay = 0.98  
-            self.influence_cooldown = 0  
-        elif agent_type == "echo_chamber":
-            self.only_similar = True
-            self.belief_strength = 0.7  
-            self.critical_thinking = max(0.1, self.critical_thinking)  # Lower minimum critical thinking
-            self.cluster_radius = 3 
-
-            self.cluster_center = None  
-            self.belief_reinforcement = 0.15  
-            self.reinforcement_cooldown = 0  
 
+    @property
+    def random(self):
+        # In counter mode each draw depends only on (seed, step, agent, draw
+        # index), so results do not depend on activation order
+        counter_rng = self.model.counter_rng
+        if counter_rng is not None:
+            return counter_rng.stream(self.model.step_count, self.unique_id)
+        return self.model.random
 
-            
-        elif agent_type == "political":
-            self.political_side = None  # Will be set during creation
-            self.influence_strength = 0.8
-            self.polarization = 0.7  
-            self.conversion_chance = 0.3  # Chance to convert others
-            self.movement_speed = 1
-            self.influence_radius = 2 
+    @property
+    def believes_misinformation(self):
+        return self._believes_misinformation
+
+    @believes_misinformation.setter
+    def believes_misinformation(self, value):
+        """Set the belief, keeping `belief` and the grid's belief counts in sync"""
+        # Under simultaneous activation the change waits for the end of the step
+        if self._tallied and self.model.belief_buffer is not None:
+            self.model.belief_buffer[self] = value
+            return
+        changed = getattr(self, "_believes_misinformation", value) != value
+        self._believes_misinformation = value
+        self.belief = "misinformed" if value else "informed"
+        if changed:
+            if self.pos is not None:
+                self.model.grid.update_belief(self)
+            if self._tallied:
+                self.model.tallies.belief_changed(value)
+
+    @property
+    def critical_thinking(self):
+        return self._critical_thinking
+
+    @critical_thinking.setter
+    def critical_thinking(self, value):
+        if self._tallied:
+            self.model.tallies.critical_thinking += value - self._critical_thinking
+        self._critical_thinking = value
+
+    @property
+    def influence_count(self):
+        return self._influence_count
+
+    @influence_count.setter
+    def influence_count(self, value):
+        if self._tallied and self.agent_type == "influencer":
+            self.model.tallies.total_influence += value - self._influence_count
+        self._influence_count = value
+
+    @property
+    def political_side(self):
+        return self._political_side
+
+    @political_side.setter
+    def political_side(self, value):
+        if self._tallied and self.agent_type == "political":
+            self.model.tallies.political_side_changed(self._political_side, value)
+        self._political_side = value
 
     def calculate_cluster_center(self):
         """Calculate the center of the cluster this agent belongs to"""
@@ -70,37 +109,22 @@ class UserAgent(Agent):
         return (center_x, center_y)
 
     def step(self):
-        # Initialize cluster center for echo chamber agents if not set
-        if self.agent_type == "echo_chamber" and self.cluster_center is None:
-            self.cluster_center = self.calculate_cluster_center()
-            
-        if self.agent_type == "fact_checker":
-            self.fact_checker_step()
-        elif self.agent_type == "influencer":
-            self.influencer_step()
-        elif self.agent_type == "echo_chamber":
-            self.echo_chamber_step()
-        elif self.agent_type == "political":
-            self.political_step()
-        else:
-            self.normal_step()
+        # Each subclass overrides step with its own behavior
+        self.normal_step()
 
     def normal_step(self):
-        neighbors = self.model.grid.get_neighbors(self.pos, moore=True, include_center=False)
-        misinformation_count = sum(1 for n in neighbors if n.believes_misinformation)
-        total_neighbors = len(neighbors)
+        misinformation_count = self.model.grid.count_misinformed(self.pos)
+        total_neighbors = self.model.grid.count_agents(self.pos)
 
         if not self.believes_misinformation:
             chance = misinformation_count / total_neighbors if total_neighbors > 0 else 0
             adjusted_chance = chance * (1 - self.critical_thinking)
             if self.random.random() < adjusted_chance:
                 self.believes_misinformation = True
-                self.belief = "misinformed"
         else:
             informed_count = total_neighbors - misinformation_count
             if informed_count > misinformation_count and self.random.random() < self.critical_thinking:
                 self.believes_misinformation = False
-                self.belief = "informed"
 
     def fact_checker_step(self):
         """Execute fact checker's step"""
@@ -111,7 +135,11 @@ class UserAgent(Agent):
             self.move_towards_misinformation()
             return
 
-       
+        # Skip building the neighbor list when nobody nearby is misinformed
+        if self.model.grid.count_misinformed(self.pos, radius=self.search_radius) == 0:
+            self.move_towards_misinformation()
+            return
+
         extended_neighbors = self.model.grid.get_neighbors(
             self.pos, moore=True, include_center=False, radius=self.search_radius
         )
@@ -120,18 +148,19 @@ class UserAgent(Agent):
         misinformed_neighbors = [n for n in extended_neighbors if n.believes_misinformation]
         if misinformed_neighbors:
             
-            misinformed_neighbors.sort(key=lambda x: x.critical_thinking, reverse=True)
-            
-            for neighbor in misinformed_neighbors:
+            # Most critical thinkers first; only the candidates tried get ranked
+            for neighbor in by_priority(misinformed_neighbors, lambda x: x.critical_thinking, highest_first=True):
                 self.correction_attempts += 1
                 
                 adjusted_strength = self.correction_strength * (0.8 + neighbor.critical_thinking * 0.2)
                 
                 if self.random.random() < adjusted_strength:
                     neighbor.believes_misinformation = False
-                    neighbor.belief = "informed"
                     self.correction_count += 1
                     self.successful_corrections += 1
+                    self.model.events.emit(
+                        self.model.step_count, "correction", agent=self.unique_id, target=neighbor.unique_id
+                    )
                     
                    
                     neighbor.critical_thinking = min(1.0, neighbor.critical_thinking + 0.4)
@@ -152,29 +181,40 @@ class UserAgent(Agent):
         
         for _ in range(self.movement_speed):
             self.move_to_center()
-        
+
+        # Skip building the neighbor list when every neighbor already agrees
+        if self.believes_misinformation:
+            opposing = self.model.grid.count_informed(self.pos, radius=self.influence_radius)
+        else:
+            opposing = self.model.grid.count_misinformed(self.pos, radius=self.influence_radius)
+        if opposing == 0:
+            return
+
         extended_neighbors = self.model.grid.get_neighbors(
             self.pos, moore=True, include_center=False, radius=self.influence_radius
         )
         
-        extended_neighbors.sort(key=lambda x: x.critical_thinking)
+        targets = [n for n in extended_neighbors if n.believes_misinformation != self.believes_misinformation]
         
-        for neighbor in extended_neighbors:
-            if neighbor.believes_misinformation != self.believes_misinformation:
+        # Least critical thinkers first; only the candidates tried get ranked
+        for neighbor in by_priority(targets, lambda x: x.critical_thinking):
+            
+            adjusted_strength = self.influence_strength * (1.0 - neighbor.critical_thinking * 0.5)
+            
+            if self.random.random() < adjusted_strength:
+                neighbor.believes_misinformation = self.believes_misinformation
+                self.influence_count += 1
+                self.model.events.emit(
+                    self.model.step_count, "conversion", agent=self.unique_id, target=neighbor.unique_id,
+                    misinformed=self.believes_misinformation,
+                )
                 
-                adjusted_strength = self.influence_strength * (1.0 - neighbor.critical_thinking * 0.5)
+              
+                if neighbor.agent_type == "echo_chamber":
+                    neighbor.belief_strength = max(0.1, neighbor.belief_strength - 0.3)
                 
-                if self.random.random() < adjusted_strength:
-                    neighbor.believes_misinformation = self.believes_misinformation
-                    neighbor.belief = self.belief
-                    self.influence_count += 1
-                    
-                  
-                    if neighbor.agent_type == "echo_chamber":
-                        neighbor.belief_strength = max(0.1, neighbor.belief_strength - 0.3)
-                    
-                    self.influence_cooldown = 1  
-                    break  
+                self.influence_cooldown = 1  
+                break  
 
     def echo_chamber_step(self):
         # Apply cooldown
@@ -182,69 +222,87 @@ class UserAgent(Agent):
             self.reinforcement_cooldown -= 1
             return
 
-      
-        neighbors = self.model.grid.get_neighbors(
-            self.pos, moore=True, include_center=False, radius=self.cluster_radius
-        )
-        
-        similar_neighbors = [n for n in neighbors if n.believes_misinformation == self.believes_misinformation]
-        
-        if similar_neighbors:
+        # Count similar neighbors from the grid index; the list itself is only
+        # built when reinforcing or moving needs it
+        grid = self.model.grid
+        if self.believes_misinformation:
+            similar_count = grid.count_misinformed(self.pos, radius=self.cluster_radius)
+        else:
+            similar_count = grid.count_informed(self.pos, radius=self.cluster_radius)
+        similar_neighbors = None
+
+        if similar_count:
             # Reinforce belief within echo chamber more frequently
             if self.random.random() < 0.4:  
                 self.belief_strength = min(1.0, self.belief_strength + self.belief_reinforcement)
                 self.critical_thinking = max(0.1, self.critical_thinking - 0.08)  
                 
                 # Try to influence similar neighbors to strengthen their belief
-                for neighbor in similar_neighbors:
-                    if neighbor.agent_type == "echo_chamber":
-                        neighbor.belief_strength = min(1.0, neighbor.belief_strength + self.belief_reinforcement * 0.7)  
-                        neighbor.critical_thinking = max(0.1, neighbor.critical_thinking - 0.05)
+                if self.model.reinforcement is not None:
+                    self.model.reinforcement.add(self)
+                else:
+                    similar_neighbors = self.get_similar_neighbors()
+                    for neighbor in similar_neighbors:
+                        if neighbor.agent_type == "echo_chamber":
+                            neighbor.belief_strength = min(1.0, neighbor.belief_strength + self.belief_reinforcement * 0.7)  
+                            neighbor.critical_thinking = max(0.1, neighbor.critical_thinking - 0.05)
                 
                 self.reinforcement_cooldown = 1  # Add cooldown after reinforcement
             
-            if len(similar_neighbors) < len(neighbors) * 0.7:  
+            if similar_count < grid.count_agents(self.pos, radius=self.cluster_radius) * 0.7:  
+                if similar_neighbors is None:
+                    similar_neighbors = self.get_similar_neighbors()
                 self.move_towards_similar(similar_neighbors)
         else:
             # Return to cluster center if too far
             self.return_to_cluster()
 
-    def move_towards_misinformation(self):
-        """Move towards areas with higher concentration of misinformed agents"""
-        # Get all agents in search radius
-        extended_neighbors = self.model.grid.get_neighbors(
-            self.pos, moore=True, include_center=False, radius=self.search_radius * 2
+    def political_step(self):
+        """Partisans recruit nearby agents to their side; neutral agents follow natural spread"""
+        if self.political_side == "neutral":
+            self.normal_step()
+            self.move_randomly()
+            return
+
+        neighbors = self.model.grid.get_neighbors(
+            self.pos, moore=True, include_center=False, radius=self.influence_radius
         )
-        
-        if extended_neighbors:
-            # Calculate direction with most misinformed agents
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, 1), (1, -1), (-1, -1)]
-            best_direction = None
-            max_misinfo = -1
-            
-            for dx, dy in directions:
-                new_x = (self.pos[0] + dx) % self.model.grid.width
-                new_y = (self.pos[1] + dy) % self.model.grid.height
-                cell_agents = self.model.grid.get_cell_list_contents([(new_x, new_y)])
-                misinfo_count = sum(1 for a in cell_agents if a.believes_misinformation)
-                
-                if misinfo_count > max_misinfo:
-                    max_misinfo = misinfo_count
-                    best_direction = (dx, dy)
-            
-            if best_direction:
-                # Move one step in the best direction
-                new_x = (self.pos[0] + best_direction[0]) % self.model.grid.width
-                new_y = (self.pos[1] + best_direction[1]) % self.model.grid.height
-                self.model.grid.move_agent(self, (new_x, new_y))
-            else:
-                # If no direction has misinformed agents, move randomly
-                possible_steps = self.model.grid.get_neighborhood(
-                    self.pos, moore=True, include_center=False
+        others = [n for n in neighbors if n.agent_type == "political" and n.political_side != self.political_side]
+        if others:
+            target = self.random.choice(others)
+            # Partisans of the other side resist in proportion to polarization
+            resistance = self.polarization if target.political_side != "neutral" else 0.0
+            if self.random.random() < self.conversion_chance * (1 - target.critical_thinking) * (1 - resistance):
+                target.political_side = self.political_side
+                if self.random.random() < self.influence_strength:
+                    target.believes_misinformation = self.believes_misinformation
+                self.model.events.emit(
+                    self.model.step_count, "conversion", agent=self.unique_id, target=target.unique_id,
+                    side=self.political_side,
                 )
-                if possible_steps:
-                    new_position = self.random.choice(possible_steps)
-                    self.model.grid.move_agent(self, new_position)
+
+        # Polarized agents drift towards their own side
+        allies = [n for n in neighbors if n.agent_type == "political" and n.political_side == self.political_side]
+        if allies and self.random.random() < self.polarization:
+            self.move_towards_agent(self.random.choice(allies))
+        else:
+            self.move_randomly()
+
+    def get_similar_neighbors(self):
+        """Neighbors within the cluster radius that share this agent's belief"""
+        neighbors = self.model.grid.get_neighbors(
+            self.pos, moore=True, include_center=False, radius=self.cluster_radius
+        )
+        return [n for n in neighbors if n.believes_misinformation == self.believes_misinformation]
+
+    def move_towards_misinformation(self):
+        """Move one step up the model's misinformation density gradient"""
+        target = self.model.density.uphill(self.pos)
+        if target is not None:
+            self.model.grid.move_agent(self, target)
+        elif not self.model.density.value(self.pos):
+            # Nothing misinformed within reach, so explore
+            self.move_randomly()
 
     def move_to_center(self):
         center_x = self.model.grid.width // 2
@@ -322,3 +380,88 @@ class UserAgent(Agent):
         if possible_steps:
             new_position = self.random.choice(possible_steps)
             self.model.grid.move_agent(self, new_position)
+
+
+class FactCheckerAgent(UserAgent):
+    __slots__ = (
+        "correction_attempts", "successful_corrections", "correction_cooldown", "last_position",
+    )
+
+    correction_strength = 0.95
+    search_radius = 3
+    movement_speed = 1
+
+    def __init__(self, unique_id, model, agent_type="fact_checker", critical_thinking=None, misinformation=False):
+        super().__init__(unique_id, model, agent_type, critical_thinking, misinformation)
+        self.critical_thinking = 1.0
+        self.believes_misinformation = False
+        self.correction_attempts = 0
+        self.successful_corrections = 0
+        self.correction_cooldown = 0
+        self.last_position = None  # Track last position for movement
+
+    def step(self):
+        self.fact_checker_step()
+
+
+class InfluencerAgent(UserAgent):
+    __slots__ = ("influence_cooldown",)
+
+    influence_radius = 3
+    influence_strength = 0.9
+    movement_speed = 2
+    influence_decay = 0.98
+
+    def __init__(self, unique_id, model, agent_type="influencer", critical_thinking=None, misinformation=False):
+        super().__init__(unique_id, model, agent_type, critical_thinking, misinformation)
+        self.influence_cooldown = 0
+
+    def step(self):
+        self.influencer_step()
+
+
+class EchoChamberAgent(UserAgent):
+    __slots__ = ("belief_strength", "cluster_center", "reinforcement_cooldown")
+
+    only_similar = True
+    cluster_radius = 3
+    belief_reinforcement = 0.15
+
+    def __init__(self, unique_id, model, agent_type="echo_chamber", critical_thinking=None, misinformation=False):
+        super().__init__(unique_id, model, agent_type, critical_thinking, misinformation)
+        self.belief_strength = 0.7
+        self.critical_thinking = max(0.1, self.critical_thinking)  # Lower minimum critical thinking
+        self.cluster_center = None
+        self.reinforcement_cooldown = 0
+
+    def step(self):
+        # Initialize cluster center if not set
+        if self.cluster_center is None:
+            self.cluster_center = self.calculate_cluster_center()
+        self.echo_chamber_step()
+
+
+class PoliticalAgent(UserAgent):
+    __slots__ = ("_political_side",)
+
+    influence_strength = 0.8
+    polarization = 0.7
+    conversion_chance = 0.3  # Chance to convert others
+    movement_speed = 1
+    influence_radius = 2
+
+    def __init__(self, unique_id, model, agent_type="political", critical_thinking=None, misinformation=False):
+        super().__init__(unique_id, model, agent_type, critical_thinking, misinformation)
+        self.political_side = None  # Will be set during creation
+
+    def step(self):
+        self.political_step()
+
+
+AGENT_CLASSES = {
+    "normal": UserAgent,
+    "fact_checker": FactCheckerAgent,
+    "influencer": InfluencerAgent,
+    "echo_chamber": EchoChamberAgent,
+    "political": PoliticalAgent,
+}
@@ -1,5 +1,11 @@
+import queue
+import tkinter as tk
+from tkinter import ttk
+
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from misinformation_model import MisinformationModel
+from sim_worker import SimulationWorker
 
 class MisinformationSimulation:
     def __init__(self, root):
@@ -28,6 +34,54 @@ class MisinformationSimulation:
                 variable=self.scenario_var
             ).grid(row=0, column=i+1, padx=5)
 
+        # Run controls; the model steps in a background worker and the GUI
+        # redraws from its snapshots at most max_fps times a second
+        self.max_fps = 20
+        self.worker = None
+        ttk.Button(self.main_frame, text="Start", command=self.start_simulation).grid(row=1, column=0, sticky=tk.W)
+        ttk.Button(self.main_frame, text="Stop", command=self.stop_simulation).grid(row=1, column=1, sticky=tk.W)
+        self.rate_var = tk.StringVar(value="0.0 steps/s")
+        ttk.Label(self.main_frame, textvariable=self.rate_var).grid(row=1, column=2, columnspan=2, sticky=tk.W)
+
+        self.create_graphs()
+
+    def start_simulation(self):
+        """Create a model for the selected scenario and step it in the background"""
+        self.stop_simulation()
+        self.model = MisinformationModel(scenario=self.scenario_var.get())
+        self.graph_data = {}
+        self.worker = SimulationWorker(self.model)
+        self.worker.start()
+        self.root.after(1000 // self.max_fps, self.poll_snapshots, self.worker)
+
+    def stop_simulation(self):
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+
+    def poll_snapshots(self, worker):
+        """Fold every queued snapshot into the graph data and redraw once"""
+        if worker is not self.worker:
+            return  # Stopped or replaced by a newer run
+        latest = None
+        while True:
+            try:
+                snapshot = worker.snapshots.get_nowait()
+            except queue.Empty:
+                break
+            self.append_rows(snapshot["rows"])
+            latest = snapshot
+        if latest is not None:
+            self.rate_var.set(f"Step {latest['step']}: {latest['steps_per_second']:.1f} steps/s")
+            self.update_graphs()
+        if latest is None or not latest["done"]:
+            self.root.after(1000 // self.max_fps, self.poll_snapshots, worker)
+
+    def append_rows(self, new_rows):
+        new_rows['Political'] = new_rows['Left_Leaning'] + new_rows['Right_Leaning'] + new_rows['Neutral']
+        for name, values in new_rows.items():
+            self.graph_data.setdefault(name, []).extend(values.tolist())
+
     def create_graphs(self):
         """Create and update graphs"""
         # Create figure with subplots
@@ -62,25 +116,31 @@ class MisinformationSimulation:
         self.canvas.get_tk_widget().grid(row=3, column=0, columnspan=6, pady=10)
 
     def update_graphs(self):
-        """Update graphs with new data"""
-        # Get data from model
-        model_data = self.model.datacollector.get_model_vars_dataframe()
-        
+        """Update graphs with the rows received from the worker"""
+        model_data = self.graph_data
+        steps = range(len(model_data.get('Informed', [])))
+        if not steps:
+            return
+
         # Update misinformation spread plot
-        self.line1.set_data(range(len(model_data)), model_data['Informed'])
-        self.line2.set_data(range(len(model_data)), model_data['Misinformed'])
+        self.line1.set_data(steps, model_data['Informed'])
+        self.line2.set_data(steps, model_data['Misinformed'])
         self.ax1.relim()
         self.ax1.autoscale_view()
         
         # Update agent types plot
-        self.line3.set_data(range(len(model_data)), model_data['Fact_Checkers'])
-        self.line4.set_data(range(len(model_data)), model_data['Influencers'])
-        self.line5.set_data(range(len(model_data)), model_data['Echo_Chambers'])
-        self.line6.set_data(range(len(model_data)), model_data['Left_Leaning'] + model_data['Right_Leaning'] + model_data['Neutral'])
+        self.line3.set_data(steps, model_data['Fact_Checkers'])
+        self.line4.set_data(steps, model_data['Influencers'])
+        self.line5.set_data(steps, model_data['Echo_Chambers'])
+        self.line6.set_data(steps, model_data['Political'])
         self.ax2.relim()
         self.ax2.autoscale_view()
         
-        # Redraw canvas
-        self.canvas.draw() 
+        # Redraw canvas when Tk is idle
+        self.canvas.draw_idle()
+
 
-        
\ No newline at end of file
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = MisinformationSimulation(root)
+    root.mainloop()
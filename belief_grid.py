@@ -0,0 +1,315 @@
+# belief_grid.py
+
+from collections import OrderedDict
+
+import numpy as np
+from mesa.space import MultiGrid
+
+
+def _lowbit(i):
+    return i & -i
+
+
+def _prefix_indices(i):
+    """Fenwick tree nodes whose sum is the prefix total over indices < i"""
+    indices = []
+    while i > 0:
+        indices.append(i)
+        i -= _lowbit(i)
+    return indices
+
+
+def _update_indices(i, size):
+    """Fenwick tree nodes covering index i, for a tree over `size` indices"""
+    indices = []
+    i += 1
+    while i <= size:
+        indices.append(i)
+        i += _lowbit(i)
+    return indices
+
+
+class BeliefGrid(MultiGrid):
+    """MultiGrid that keeps per-cell belief counts.
+
+    Counts of misinformed agents and of all agents are updated on every
+    place, remove, move and belief flip, so "how many misinformed agents are
+    within radius r" never builds a neighbor list. Small radii are summed
+    straight from the count arrays; larger ones come from 2-D Fenwick trees,
+    which take a change in O(log W * log H) and are only brought up to date
+    when such a query is made.
+    """
+
+    # Radii up to this are summed directly from the cell counts; measured on
+    # a 1000x1000 grid, a slice sum stays cheaper than a tree query until the
+    # box is over a hundred cells wide
+    direct_radius = 64
+    # Above this many pending cell changes per cell of the grid, rebuilding
+    # the trees is cheaper than applying the changes one at a time
+    rebuild_fraction = 1 / 256
+    # Bounds for the neighborhood caches: offset tables are kept per query
+    # shape, resolved neighborhoods per position up to this many cells in total
+    max_offset_tables = 32
+    max_cached_cells = 500_000
+
+    def __init__(self, width, height, torus):
+        super().__init__(width, height, torus)
+        self.misinformed_counts = np.zeros((width, height), dtype=np.int64)
+        self.agent_counts = np.zeros((width, height), dtype=np.int64)
+        # Fenwick trees over the counts, 1-based on both axes
+        self._misinformed_tree = np.zeros((width + 1, height + 1), dtype=np.int64)
+        self._agent_tree = np.zeros((width + 1, height + 1), dtype=np.int64)
+        self._pending = []
+        self._trees_stale = False
+        # Every cell's agent list, indexed by x * height + y
+        self._cells = [cell for column in self._grid for cell in column]
+        self._offset_tables = OrderedDict()
+        self._neighborhoods = OrderedDict()
+        self._cached_cells = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.table_hits = 0
+        self.table_misses = 0
+
+    def place_agent(self, agent, pos):
+        """Place the agent and count it in its cell"""
+        x, y = pos
+        placed = agent.pos is None or agent not in self._grid[x][y]
+        super().place_agent(agent, pos)
+        if placed:
+            self._change_cell(x, y, int(agent.believes_misinformation), 1)
+
+    def place_agents(self, agents, xs, ys, believes=None):
+        """Place many unplaced agents at once, counting them in one pass;
+        `believes` gives their beliefs if the caller already has them"""
+        xs, ys = np.asarray(xs), np.asarray(ys)
+        for agent, x, y in zip(agents, xs.tolist(), ys.tolist()):
+            self._grid[x][y].append(agent)
+            agent.pos = (x, y)
+        if self._empties_built:
+            self._empties.difference_update(zip(xs.tolist(), ys.tolist()))
+        if believes is None:
+            believes = np.fromiter((a.believes_misinformation for a in agents), dtype=bool, count=len(agents))
+        cells = xs * self.height + ys
+        size = self.width * self.height
+        self.agent_counts += np.bincount(cells, minlength=size).reshape(self.width, self.height)
+        self.misinformed_counts += np.bincount(
+            cells[np.asarray(believes, dtype=bool)], minlength=size
+        ).reshape(self.width, self.height)
+        self._rebuild_tables()
+
+    def remove_agent(self, agent):
+        """Remove the agent and discount it from its cell"""
+        x, y = agent.pos
+        super().remove_agent(agent)
+        self._change_cell(x, y, -int(agent.believes_misinformation), -1)
+
+    def update_belief(self, agent):
+        """Record that a placed agent flipped its belief"""
+        x, y = agent.pos
+        self._change_cell(x, y, 1 if agent.believes_misinformation else -1, 0)
+
+    def _change_cell(self, x, y, misinformed_delta, agent_delta):
+        self.misinformed_counts[x, y] += misinformed_delta
+        self.agent_counts[x, y] += agent_delta
+        if not self._trees_stale:
+            self._pending.append((x, y, misinformed_delta, agent_delta))
+            if len(self._pending) > self.rebuild_fraction * self.width * self.height:
+                self._rebuild_tables()
+
+    def _refresh_tables(self):
+        """Bring the Fenwick trees up to date with the cell counts"""
+        if self._trees_stale:
+            self._build_trees()
+            return
+        for x, y, misinformed_delta, agent_delta in self._pending:
+            cells = np.ix_(_update_indices(x, self.width), _update_indices(y, self.height))
+            if misinformed_delta:
+                self._misinformed_tree[cells] += misinformed_delta
+            if agent_delta:
+                self._agent_tree[cells] += agent_delta
+        self._pending.clear()
+
+    def _rebuild_tables(self):
+        """Mark the trees for a rebuild from the counts, e.g. after the counts
+        were written wholesale"""
+        self._trees_stale = True
+        self._pending.clear()
+
+    def _build_trees(self):
+        # Node (i, j) holds the cells in (i - lowbit(i), i] x (j - lowbit(j), j],
+        # read off the summed-area table by inclusion-exclusion
+        rows = np.arange(self.width + 1)
+        columns = np.arange(self.height + 1)
+        rows_low, columns_low = rows - _lowbit(rows), columns - _lowbit(columns)
+        for counts, tree in ((self.misinformed_counts, self._misinformed_tree), (self.agent_counts, self._agent_tree)):
+            table = np.zeros((self.width + 1, self.height + 1), dtype=np.int64)
+            table[1:, 1:] = counts.cumsum(0).cumsum(1)
+            tree[:] = table - table[rows_low] - table[:, columns_low] + table[np.ix_(rows_low, columns_low)]
+        self._trees_stale = False
+
+    def _axis_ranges(self, center, radius, size):
+        """Half-open index ranges covered by [center - radius, center + radius]"""
+        if self.torus:
+            if 2 * radius + 1 >= size:
+                return ((0, size),)
+            low, high = center - radius, center + radius + 1
+            if low < 0:
+                return ((low + size, size), (0, high))
+            if high > size:
+                return ((low, size), (0, high - size))
+            return ((low, high),)
+        return ((max(0, center - radius), min(size, center + radius + 1)),)
+
+    def _box_sum(self, counts, tree, pos, radius):
+        x, y = pos
+        total = 0
+        if radius <= self.direct_radius:
+            for x0, x1 in self._axis_ranges(x, radius, self.width):
+                for y0, y1 in self._axis_ranges(y, radius, self.height):
+                    total += counts[x0:x1, y0:y1].sum()
+            return int(total)
+
+        if self._pending or self._trees_stale:
+            self._refresh_tables()
+        for x0, x1 in self._axis_ranges(x, radius, self.width):
+            for y0, y1 in self._axis_ranges(y, radius, self.height):
+                # The four corner prefix sums in a single gather, signed by
+                # inclusion-exclusion
+                rows_high, rows_low = _prefix_indices(x1), _prefix_indices(x0)
+                columns_high, columns_low = _prefix_indices(y1), _prefix_indices(y0)
+                row_signs = np.array([1] * len(rows_high) + [-1] * len(rows_low))
+                column_signs = np.array([1] * len(columns_high) + [-1] * len(columns_low))
+                nodes = tree[np.ix_(rows_high + rows_low, columns_high + columns_low)]
+                total += row_signs @ nodes @ column_signs
+        return int(total)
+
+    def _moore_sum(self, counts, pos, include_center):
+        """Total over the 3x3 cells around pos on a torus at least 3 wide,
+        read cell by cell; cheaper than any slicing for the common query"""
+        x, y = pos
+        item = counts.item
+        left, right = (x - 1) % self.width, (x + 1) % self.width
+        down, up = (y - 1) % self.height, (y + 1) % self.height
+        total = (item(left, down) + item(left, y) + item(left, up) + item(x, down) + item(x, up)
+                 + item(right, down) + item(right, y) + item(right, up))
+        if include_center:
+            total += item(x, y)
+        return total
+
+    def _count(self, counts, tree, pos, radius, include_center):
+        if radius == 1 and self.torus and self.width >= 3 and self.height >= 3:
+            return self._moore_sum(counts, pos, include_center)
+        total = self._box_sum(counts, tree, pos, radius)
+        if not include_center:
+            total -= counts.item(pos)
+        return total
+
+    def count_misinformed(self, pos, radius=1, include_center=False):
+        """Number of misinformed agents in the Moore neighborhood of pos"""
+        return self._count(self.misinformed_counts, self._misinformed_tree, pos, radius, include_center)
+
+    def count_agents(self, pos, radius=1, include_center=False):
+        """Number of agents in the Moore neighborhood of pos"""
+        return self._count(self.agent_counts, self._agent_tree, pos, radius, include_center)
+
+    def count_informed(self, pos, radius=1, include_center=False):
+        """Number of informed agents in the Moore neighborhood of pos"""
+        return (self.count_agents(pos, radius, include_center)
+                - self.count_misinformed(pos, radius, include_center))
+
+    def misinformed_at(self, pos):
+        """Number of misinformed agents in a single cell"""
+        return int(self.misinformed_counts[pos])
+
+    def _offset_table(self, moore, include_center, radius):
+        """Neighborhood offsets for one query shape, in MultiGrid's order.
+
+        On a torus the ranges are trimmed the same way MultiGrid trims them, so
+        no cell appears twice and neighbor lists keep MultiGrid's order.
+        """
+        key = (radius, moore, include_center, self.torus)
+        table = self._offset_tables.get(key)
+        if table is not None:
+            self.table_hits += 1
+            self._offset_tables.move_to_end(key)
+            return table
+        self.table_misses += 1
+
+        x_radius = y_radius = radius
+        kx = ky = 0
+        if self.torus:
+            x_max, y_max = self.width // 2, self.height // 2
+            x_radius, y_radius = min(radius, x_max), min(radius, y_max)
+            kx = int(x_radius == x_max and self.width % 2 == 0)
+            ky = int(y_radius == y_max and self.height % 2 == 0)
+        dx, dy = np.meshgrid(
+            np.arange(-x_radius, x_radius + 1 - kx), np.arange(-y_radius, y_radius + 1 - ky), indexing="ij"
+        )
+        dx, dy = dx.ravel(), dy.ravel()
+        keep = np.ones(dx.size, dtype=bool)
+        if not moore:
+            keep &= np.abs(dx) + np.abs(dy) <= radius
+        if not include_center:
+            keep &= (dx != 0) | (dy != 0)
+        table = (dx[keep], dy[keep])
+
+        self._offset_tables[key] = table
+        if len(self._offset_tables) > self.max_offset_tables:
+            self._offset_tables.popitem(last=False)
+        return table
+
+    def _neighborhood(self, pos, moore, include_center, radius):
+        """(coordinates, flat cell indices) of a neighborhood, from the
+        bounded per-position cache"""
+        key = (pos, moore, include_center, radius)
+        entry = self._neighborhoods.get(key)
+        if entry is not None:
+            self.cache_hits += 1
+            self._neighborhoods.move_to_end(key)
+            return entry
+        self.cache_misses += 1
+
+        dx, dy = self._offset_table(moore, include_center, radius)
+        xs, ys = pos[0] + dx, pos[1] + dy
+        if self.torus:
+            xs, ys = xs % self.width, ys % self.height
+        else:
+            inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+            xs, ys = xs[inside], ys[inside]
+        # Tuples, so no caller can change a cached neighborhood
+        entry = (tuple(zip(xs.tolist(), ys.tolist())), tuple((xs * self.height + ys).tolist()))
+
+        self._neighborhoods[key] = entry
+        self._cached_cells += len(entry[1])
+        while self._cached_cells > self.max_cached_cells and len(self._neighborhoods) > 1:
+            _, evicted = self._neighborhoods.popitem(last=False)
+            self._cached_cells -= len(evicted[1])
+        return entry
+
+    def get_neighborhood(self, pos, moore, include_center=False, radius=1):
+        """Cells around pos, in the same order as MultiGrid.get_neighborhood.
+        Returns a new list, which the caller is free to change."""
+        return list(self._neighborhood(pos, moore, include_center, radius)[0])
+
+    def iter_neighbors(self, pos, moore, include_center=False, radius=1):
+        cells = self._cells
+        for index in self._neighborhood(pos, moore, include_center, radius)[1]:
+            yield from cells[index]
+
+    def get_neighbors(self, pos, moore, include_center=False, radius=1):
+        """Agents around pos, read from the cells' flat indices"""
+        cells = self._cells
+        return [agent for index in self._neighborhood(pos, moore, include_center, radius)[1] for agent in cells[index]]
+
+    def cache_info(self):
+        """Hit and miss counts of the neighborhood caches"""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "entries": len(self._neighborhoods),
+            "cells": self._cached_cells,
+            "table_hits": self.table_hits,
+            "table_misses": self.table_misses,
+            "tables": len(self._offset_tables),
+        }
@@ -0,0 +1,142 @@
+# benchmark.py
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from misinformation_model import MisinformationModel
+
+SCENARIOS = ["natural", "fact_checkers", "influencers", "echo_chamber", "political"]
+
+
+def run_case(case):
+    """Build and step one model configuration, returning its timings"""
+    result = dict(case)
+    collect_time = 0.0
+    try:
+        start = time.perf_counter()
+        model = MisinformationModel(
+            case["width"], case["height"], case["num_agents"], case["num_influencers"],
+            case["scenario"], engine=case["engine"], seed=case["seed"],
+        )
+        result["construct_seconds"] = time.perf_counter() - start
+
+        collect = model.datacollector.collect
+
+        def timed_collect(m):
+            nonlocal collect_time
+            collect_start = time.perf_counter()
+            collect(m)
+            collect_time += time.perf_counter() - collect_start
+
+        model.datacollector.collect = timed_collect
+
+        steps = 0
+        start = time.perf_counter()
+        while model.running and steps < case["steps"]:
+            model.step()
+            steps += 1
+            if time.perf_counter() - start > case["max_seconds"]:
+                break
+        step_seconds = time.perf_counter() - start
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        return result
+
+    result.update(
+        steps=steps,
+        step_seconds=step_seconds,
+        steps_per_second=steps / step_seconds if step_seconds > 0 else None,
+        collect_seconds=collect_time,
+        agent_step_seconds=step_seconds - collect_time,
+    )
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return result
+
+
+def build_cases(scenarios, num_agents, grid_sizes, engines, steps, num_influencers=10, seed=0, max_seconds=30.0):
+    return [
+        {
+            "scenario": scenario,
+            "num_agents": agents,
+            "num_influencers": num_influencers,
+            "width": width,
+            "height": height,
+            "engine": engine,
+            "steps": steps,
+            "seed": seed,
+            "max_seconds": max_seconds,
+        }
+        for scenario, agents, (width, height), engine in itertools.product(scenarios, num_agents, grid_sizes, engines)
+    ]
+
+
+def run_benchmarks(cases):
+    """Run every case in its own fresh process so peak RSS is per case"""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_case, case).result()
+        results.append(result)
+        print(format_result(result), file=sys.stderr)
+    return results
+
+
+def format_result(result):
+    label = f"{result['scenario']:<14} {result['engine']:<10} n={result['num_agents']:<8} {result['width']}x{result['height']}"
+    if "error" in result:
+        return f"{label}  error: {result['error']}"
+    rate = result["steps_per_second"] or 0.0
+    return (
+        f"{label}  build {result['construct_seconds']:.3f}s  {rate:.2f} steps/s  "
+        f"collect {result['collect_seconds']:.3f}s  peak {result['peak_rss_bytes'] / 2 ** 20:.0f} MiB"
+    )
+
+
+def parse_grid_size(value):
+    width, _, height = value.partition("x")
+    return int(width), int(height or width)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MisinformationModel construction and stepping")
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS)
+    parser.add_argument("--num-agents", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--grid-sizes", nargs="+", type=parse_grid_size, default=[(10, 10), (100, 100)],
+                        help="Grid sizes as WIDTHxHEIGHT")
+    parser.add_argument("--engines", nargs="+", default=["agent"], choices=["agent", "vectorized", "tiled"])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--max-seconds", type=float, default=30.0,
+                        help="Stop stepping a case after this much wall time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    cases = build_cases(
+        args.scenarios, args.num_agents, args.grid_sizes, args.engines, args.steps,
+        seed=args.seed, max_seconds=args.max_seconds,
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run_benchmarks(cases),
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
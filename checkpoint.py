@@ -0,0 +1,258 @@
+# checkpoint.py
+
+import json
+
+import numpy as np
+
+from agent import AGENT_CLASSES
+from belief_grid import BeliefGrid
+from counter_rng import CounterRNG
+from distributed import TiledNaturalSpreadEngine
+from event_log import EventLog
+from misinformation_model import MisinformationModel
+from recorder import SeriesRecorder
+from scheduler import TypeStagedActivation
+from vectorized import NaturalSpreadEngine
+
+FORMAT_VERSION = 1
+
+# Agent state rebuilt from the model rather than stored per agent
+_SKIPPED_FIELDS = {"unique_id", "model", "pos", "_tallied"}
+
+# Default for load_checkpoint's outputs: write where the saved model did
+SAVED = "saved"
+
+
+def _agent_fields(agent):
+    """Every stored attribute of an agent: its slots plus its instance dict"""
+    fields = {}
+    for cls in type(agent).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if name not in _SKIPPED_FIELDS and hasattr(agent, name):
+                fields[name] = getattr(agent, name)
+    for name, value in vars(agent).items():
+        if name not in _SKIPPED_FIELDS:
+            fields[name] = value
+    return fields
+
+
+def _is_numeric(values):
+    return all(isinstance(v, (bool, int, float, np.integer, np.floating)) for v in values)
+
+
+def _event_log_state(events):
+    if not events.enabled:
+        return None
+    version, ints, gauss = events._random.getstate()
+    return {
+        "path": events.path,
+        "console": events.console,
+        "sample_rates": events.sample_rates,
+        "max_per_step": events.max_per_step,
+        "buffer_size": events.buffer_size,
+        "dropped": dict(events.dropped),
+        "random": [version, list(ints), gauss],
+    }
+
+
+def _restore_event_log(state):
+    events = EventLog(
+        state["path"], state["console"], state["sample_rates"], state["max_per_step"], state["buffer_size"],
+    )
+    events.dropped.update(state["dropped"])
+    version, ints, gauss = state["random"]
+    events._random.setstate((version, tuple(ints), gauss))
+    return events
+
+
+def save_checkpoint(model, path):
+    """Write the full state of a model between steps to a compressed .npz file.
+
+    Recorder rows and events are flushed first, so the checkpoint and the
+    files the model writes to agree.
+    """
+    if not isinstance(model.grid, BeliefGrid):
+        raise ValueError("Checkpoints only support grid models")
+    model.flush()
+    agents = model.schedule.agents
+    index = {agent.unique_id: i for i, agent in enumerate(agents)}
+    arrays = {
+        "unique_id": np.array([a.unique_id for a in agents], dtype=np.int64),
+        "x": np.array([a.pos[0] for a in agents], dtype=np.int64),
+        "y": np.array([a.pos[1] for a in agents], dtype=np.int64),
+        # Order of agents inside each grid cell, which neighbor lists follow
+        "grid_order": np.array(
+            [index[a.unique_id] for column in model.grid._grid for cell in column for a in cell], dtype=np.int64
+        ),
+    }
+
+    columns = {}
+    for i, agent in enumerate(agents):
+        for name, value in _agent_fields(agent).items():
+            columns.setdefault(name, {})[i] = value
+    fields = {}
+    for name, values in columns.items():
+        has = np.zeros(len(agents), dtype=bool)
+        has[list(values)] = True
+        arrays["has_" + name] = has
+        if _is_numeric(values.values()):
+            arrays["field_" + name] = np.array(list(values.values()))
+        else:
+            fields[name] = list(values.values())
+
+    random_version, random_ints, random_gauss = model.random.getstate()
+    arrays["random_state"] = np.array(random_ints, dtype=np.uint32)
+    data = model.datacollector.get_model_vars_dataframe()
+    for column in data.columns:
+        arrays["data_" + column] = data[column].to_numpy()
+
+    schedule = model.schedule
+    meta = {
+        "version": FORMAT_VERSION,
+        "params": {
+            "width": model.grid.width,
+            "height": model.grid.height,
+            "num_agents": model.num_agents,
+            "num_influencers": model.num_influencers,
+            "scenario": model.scenario,
+            "engine": model.engine.name if model.engine is not None else "agent",
+            "rng": "counter" if model.counter_rng is not None else "shared",
+            # Custom monitors are not stored; restored models use the defaults
+            "stopping": "default" if model.stopping is not None else None,
+            "reinforcement": "batched" if model.reinforcement is not None else "immediate",
+            "profile": model.profiler is not None,
+            "activation": (
+                ("simultaneous" if schedule.simultaneous else "staged")
+                if isinstance(schedule, TypeStagedActivation) else "random"
+            ),
+        },
+        "step_count": model.step_count,
+        "running": model.running,
+        "stop": {"reason": model.stop_reason, "step": model.stop_step},
+        "output": {
+            "record_to": model.datacollector.path if isinstance(model.datacollector, SeriesRecorder) else None,
+            "event_log": _event_log_state(model.events),
+            "profile_rows": model.profiler.rows if model.profiler is not None else [],
+        },
+        # Running float sums; rebuilding them would differ in the last bits
+        "tallies": {
+            "total_influence": model.tallies.total_influence,
+            "critical_thinking": model.tallies.critical_thinking,
+        },
+        "schedule": {"steps": schedule.steps, "time": schedule.time},
+        "random": {"version": random_version, "gauss": random_gauss},
+        "engine_rng": model.engine.rng.bit_generator.state if hasattr(model.engine, "rng") else None,
+        "counter_seed": model.counter_rng.seed if model.counter_rng is not None else None,
+        "fields": fields,
+        "data_columns": list(data.columns),
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    np.savez_compressed(path, **arrays)
+
+
+def load_checkpoint(path, seed=None, record_to=SAVED, event_log=SAVED):
+    """Rebuild a model from a checkpoint.
+
+    With a seed, the restored model continues with fresh randomness instead
+    of reproducing the original run. By default the model records its rows
+    and logs its events where the saved model did, cut back to the
+    checkpoint's step; pass record_to or event_log (None for in memory or
+    disabled) to send them elsewhere.
+    """
+    with np.load(path) as stored:
+        arrays = dict(stored.items())
+    meta = json.loads(arrays.pop("meta").tobytes().decode())
+    if meta["version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {meta['version']}")
+
+    params = meta["params"]
+    output = meta.get("output", {})  # Older checkpoints did not store outputs
+    if record_to == SAVED:
+        record_to = output.get("record_to")
+    if event_log == SAVED:
+        state = output.get("event_log")
+        event_log = _restore_event_log(state) if state is not None else None
+    if event_log is not None:
+        event_log.discard_after(meta["step_count"])
+    # Engines are attached once the agents exist
+    model = MisinformationModel(
+        **dict(params, engine="agent"), population="empty", record_to=record_to, event_log=event_log,
+    )
+    if model.profiler is not None:
+        model.profiler.rows = list(output.get("profile_rows", []))
+    count = len(arrays["unique_id"])
+
+    # Attribute values per agent, from the numeric arrays and the JSON fields
+    field_values = {}
+    for name in [key[len("has_"):] for key in arrays if key.startswith("has_")]:
+        present = np.flatnonzero(arrays["has_" + name])
+        if "field_" + name in arrays:
+            values = arrays["field_" + name].tolist()
+        else:
+            values = [tuple(v) if isinstance(v, list) else v for v in meta["fields"][name]]
+        field_values[name] = dict(zip(present.tolist(), values))
+
+    agents = []
+    for i in range(count):
+        agent_type = field_values["agent_type"][i]
+        agent = AGENT_CLASSES[agent_type](
+            int(arrays["unique_id"][i]), model, agent_type,
+            field_values["_critical_thinking"][i], field_values["_believes_misinformation"][i],
+        )
+        for name, values in field_values.items():
+            if i in values:
+                setattr(agent, name, values[i])
+        agents.append(agent)
+
+    # Schedule in the saved activation order, then fill each cell in its saved order
+    for agent in agents:
+        model.schedule.add(agent)
+        model.tallies.add(agent)
+    order = arrays["grid_order"]
+    model.grid.place_agents([agents[i] for i in order], arrays["x"][order], arrays["y"][order])
+
+    model.tallies.total_influence = meta["tallies"]["total_influence"]
+    model.tallies.critical_thinking = meta["tallies"]["critical_thinking"]
+    model.step_count = meta["step_count"]
+    model.running = meta["running"]
+    stop = meta.get("stop", {})  # Older checkpoints predate stop tracking
+    model.stop_reason = stop.get("reason")
+    model.stop_step = stop.get("step")
+    model.schedule.steps = meta["schedule"]["steps"]
+    model.schedule.time = meta["schedule"]["time"]
+    if isinstance(model.datacollector, SeriesRecorder):
+        model.datacollector.restore({column: arrays["data_" + column] for column in meta["data_columns"]})
+    else:
+        model.datacollector.model_vars = {
+            column: arrays["data_" + column].tolist() for column in meta["data_columns"]
+        }
+
+    if model.counter_rng is not None:
+        model.counter_rng = CounterRNG(seed if seed is not None else meta["counter_seed"])
+    # The tiled engine hands the counter seed to its workers, so it comes after
+    if params["engine"] == "vectorized":
+        model.engine = NaturalSpreadEngine(model)
+    elif params["engine"] == "tiled":
+        model.engine = TiledNaturalSpreadEngine(model)
+    if seed is not None:
+        model.reset_randomizer(seed)
+        if hasattr(model.engine, "rng"):
+            model.engine.rng = np.random.default_rng(model.random.getrandbits(64))
+    else:
+        random_state = (meta["random"]["version"], tuple(arrays["random_state"].tolist()), meta["random"]["gauss"])
+        model.random.setstate(random_state)
+        if hasattr(model.engine, "rng"):
+            model.engine.rng.bit_generator.state = meta["engine_rng"]
+    return model
+
+
+def fork_checkpoint(path, count, seeds=None, base_seed=0):
+    """Restore `count` independent continuations of one checkpoint, each with
+    its own seed (derived from base_seed unless given).
+
+    Forks would overwrite each other's files, so they record in memory and
+    log no events.
+    """
+    if seeds is None:
+        seeds = np.random.SeedSequence(base_seed).generate_state(count, dtype=np.uint64).tolist()
+    return [load_checkpoint(path, seed=seed, record_to=None, event_log=None) for seed in seeds]
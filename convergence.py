@@ -0,0 +1,124 @@
+# convergence.py
+
+import numpy as np
+
+from recorder import rows_since
+
+
+class AbsorbingState:
+    """Stop once a reporter reaches a value the run can never leave"""
+
+    window = 0
+
+    def __init__(self, column, value=0, reason=None):
+        self.column = column
+        self.value = value
+        self.reason = reason or f"absorbing:{column}={value}"
+
+    def check(self, model, series, current):
+        if current[self.column] == self.value:
+            return self.reason
+        return None
+
+
+class SteadyState:
+    """Stop once the reporters have settled.
+
+    Over the last `window` steps, each column's standard deviation and the
+    drift between the means of the window's two halves must both be within
+    `tolerance` times the number of agents.
+    """
+
+    def __init__(self, columns, window=50, tolerance=0.01):
+        self.columns = columns
+        self.window = window
+        self.tolerance = tolerance
+
+    def check(self, model, series, current):
+        limit = self.tolerance * max(model.tallies.agents, 1)
+        for column in self.columns:
+            values = series[column]
+            if len(values) < self.window:
+                return None
+            half = self.window // 2
+            drift = abs(values[half:].mean() - values[:half].mean())
+            if values.std() > limit or drift > limit:
+                return None
+        return "steady_state"
+
+
+class Oscillation:
+    """Stop once a reporter keeps repeating with a short period.
+
+    The last `window` values must match themselves shifted by some period
+    between 2 and `max_period`, within `tolerance` times the number of
+    agents, while still moving by more than that.
+    """
+
+    def __init__(self, column, window=40, max_period=8, tolerance=0.0):
+        self.column = column
+        self.window = window
+        self.max_period = max_period
+        self.tolerance = tolerance
+
+    def check(self, model, series, current):
+        values = series[self.column]
+        if len(values) < self.window:
+            return None
+        limit = self.tolerance * max(model.tallies.agents, 1)
+        if np.ptp(values) <= limit:
+            return None  # Flat series are SteadyState's business
+        for period in range(2, self.max_period + 1):
+            if np.abs(values[period:] - values[:-period]).max() <= limit:
+                return f"oscillation:period={period}"
+        return None
+
+
+class ConvergenceMonitor:
+    """Checks stopping criteria after every step.
+
+    Windowed criteria see each reporter's recent series from the model's
+    data collector, with the state after the current step appended. The
+    first criterion that fires gives the stop reason.
+    """
+
+    def __init__(self, criteria, min_steps=0):
+        self.criteria = list(criteria)
+        self.min_steps = min_steps
+        self.window = max((criterion.window for criterion in self.criteria), default=0)
+
+    def check(self, model):
+        """Return the reason to stop, or None to keep running"""
+        if model.step_count < self.min_steps:
+            return None
+        collector = model.datacollector
+        current = {name: reporter(model) for name, reporter in collector.model_reporters.items()}
+        series = {}
+        if self.window:
+            # The collector holds one row per step, taken before the step ran
+            history = rows_since(collector, max(0, model.step_count - self.window + 1))
+            series = {name: np.append(values, current[name]) for name, values in history.items()}
+        for criterion in self.criteria:
+            reason = criterion.check(model, series, current)
+            if reason is not None:
+                return reason
+        return None
+
+
+def default_monitor(scenario):
+    """Stopping criteria suited to each scenario"""
+    beliefs = ["Misinformed"]
+    if scenario == "fact_checkers":
+        # With nobody misinformed there is nothing left to spread
+        criteria = [AbsorbingState("Misinformed", 0, reason="no_misinformed_agents"), SteadyState(beliefs)]
+    elif scenario == "natural":
+        criteria = [AbsorbingState("Misinformed", 0), AbsorbingState("Informed", 0), SteadyState(beliefs)]
+    elif scenario == "influencers":
+        criteria = [SteadyState(beliefs, window=100)]
+    elif scenario == "echo_chamber":
+        criteria = [SteadyState(beliefs), Oscillation("Misinformed")]
+    elif scenario == "political":
+        criteria = [SteadyState(beliefs + ["Left_Leaning", "Right_Leaning", "Neutral"]), Oscillation("Misinformed")]
+    else:
+        criteria = [SteadyState(beliefs)]
+    return ConvergenceMonitor(criteria)
@@ -0,0 +1,117 @@
+# counter_rng.py
+
+import numpy as np
+
+# Philox4x32-10 constants (Salmon et al., "Parallel random numbers: as easy
+# as 1, 2, 3", SC 2011)
+PHILOX_M0 = 0xD2511F53
+PHILOX_M1 = 0xCD9E8D57
+PHILOX_W0 = 0x9E3779B9
+PHILOX_W1 = 0xBB67AE85
+PHILOX_ROUNDS = 10
+MASK32 = 0xFFFFFFFF
+
+
+def philox4x32(counter, key):
+    """Philox4x32-10 over arrays of counters.
+
+    `counter` is four equally shaped uint32-compatible arrays and `key` a
+    pair of 32-bit ints; returns four uint32 arrays.
+    """
+    c0, c1, c2, c3 = (np.asarray(c, dtype=np.uint64) for c in counter)
+    k0, k1 = key[0] & MASK32, key[1] & MASK32
+    m0, m1 = np.uint64(PHILOX_M0), np.uint64(PHILOX_M1)
+    shift, mask = np.uint64(32), np.uint64(MASK32)
+    for _ in range(PHILOX_ROUNDS):
+        p0 = m0 * c0
+        p1 = m1 * c2
+        c0, c1, c2, c3 = (
+            (p1 >> shift) ^ c1 ^ np.uint64(k0),
+            p1 & mask,
+            (p0 >> shift) ^ c3 ^ np.uint64(k1),
+            p0 & mask,
+        )
+        k0 = (k0 + PHILOX_W0) & MASK32
+        k1 = (k1 + PHILOX_W1) & MASK32
+    return tuple(c.astype(np.uint32) for c in (c0, c1, c2, c3))
+
+
+def philox4x32_scalar(counter, key):
+    """Pure-Python Philox4x32-10 for a single counter; much faster than
+    NumPy for one value at a time"""
+    c0, c1, c2, c3 = (c & MASK32 for c in counter)
+    k0, k1 = key[0] & MASK32, key[1] & MASK32
+    for _ in range(PHILOX_ROUNDS):
+        p0 = PHILOX_M0 * c0
+        p1 = PHILOX_M1 * c2
+        c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k0, p1 & MASK32, (p0 >> 32) ^ c3 ^ k1, p0 & MASK32
+        k0 = (k0 + PHILOX_W0) & MASK32
+        k1 = (k1 + PHILOX_W1) & MASK32
+    return c0, c1, c2, c3
+
+
+def _to_unit(a, b):
+    """Combine two 32-bit words into a double in [0, 1) with 53 random bits"""
+    return ((a >> 5) * 67108864.0 + (b >> 6)) / 9007199254740992.0
+
+
+class CounterRNG:
+    """Deterministic random numbers keyed by (seed, step, agent id, draw index).
+
+    Every value is a pure function of its key, so it does not matter in which
+    order, batch or process agents are stepped: agent 7's second draw at step
+    12 is always the same number.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.key = (seed & MASK32, (seed >> 32) & MASK32)
+        self._streams = {}
+
+    def uniform(self, step, agent_id, draw=0):
+        a, b, _, _ = philox4x32_scalar((draw, agent_id, step, step >> 32), self.key)
+        return _to_unit(a, b)
+
+    def uniforms(self, step, agent_ids, draw=0):
+        """The `draw`-th uniform of every agent in `agent_ids` at `step`"""
+        agent_ids = np.asarray(agent_ids, dtype=np.uint64)
+        words = philox4x32(
+            (np.full(agent_ids.shape, draw), agent_ids & np.uint64(MASK32),
+             np.full(agent_ids.shape, step & MASK32), np.full(agent_ids.shape, step >> 32)),
+            self.key,
+        )
+        a, b = words[0].astype(np.uint64), words[1].astype(np.uint64)
+        return ((a >> np.uint64(5)).astype(float) * 67108864.0 + (b >> np.uint64(6)).astype(float)) / 9007199254740992.0
+
+    def stream(self, step, agent_id):
+        """The agent's random stream for a step; draws continue where the
+        agent's previous draws in the same step stopped"""
+        stream = self._streams.get(agent_id)
+        if stream is None or stream.step != step:
+            stream = self._streams[agent_id] = AgentStream(self, step, agent_id)
+        return stream
+
+
+class AgentStream:
+    """random.Random-like view of one agent's draws within one step"""
+
+    def __init__(self, rng, step, agent_id):
+        self.rng = rng
+        self.step = step
+        self.agent_id = agent_id
+        self.draw = 0
+
+    def random(self):
+        value = self.rng.uniform(self.step, self.agent_id, self.draw)
+        self.draw += 1
+        return value
+
+    def randrange(self, start, stop=None):
+        if stop is None:
+            start, stop = 0, start
+        return start + int(self.random() * (stop - start))
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[int(self.random() * len(seq))]
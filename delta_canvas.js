@@ -0,0 +1,97 @@
+// delta_canvas.js
+//
+// Client for DeltaCanvasGrid: keeps the last known state of every agent (or
+// heat-map cell), applies the deltas sent by the server and redraws with
+// Mesa's GridVisualization.
+
+const DeltaCanvasModule = function (canvas_width, canvas_height, grid_width, grid_height) {
+  const EMPTY_CELL = 255;
+
+  const parent = document.createElement("div");
+  parent.style.height = canvas_height + "px";
+  parent.className = "world-grid-parent";
+  const createCanvas = () => {
+    const el = document.createElement("canvas");
+    el.width = canvas_width;
+    el.height = canvas_height;
+    el.className = "world-grid";
+    return el;
+  };
+  const canvas = createCanvas();
+  const interaction_canvas = createCanvas();
+  parent.appendChild(canvas);
+  parent.appendChild(interaction_canvas);
+  document.getElementById("elements").appendChild(parent);
+
+  const interactionHandler = new InteractionHandler(
+    canvas_width, canvas_height, grid_width, grid_height, interaction_canvas.getContext("2d")
+  );
+  const canvasDraw = new GridVisualization(
+    canvas_width, canvas_height, grid_width, grid_height, canvas.getContext("2d"), interactionHandler
+  );
+
+  const unpack = (text, ArrayType) => {
+    const bytes = Uint8Array.from(atob(text), (c) => c.charCodeAt(0));
+    return new ArrayType(bytes.buffer);
+  };
+
+  let styles = {};
+  let agents = new Map();
+  let cells = new Uint8Array(0);
+
+  const applyAgents = (data) => {
+    if (data.full) {
+      styles = {};
+      agents = new Map();
+    }
+    Object.assign(styles, data.styles);
+    const ids = unpack(data.ids, Int32Array);
+    const xs = unpack(data.x, Int32Array);
+    const ys = unpack(data.y, Int32Array);
+    const style = unpack(data.style, Int32Array);
+    for (let i = 0; i < ids.length; i++) agents.set(ids[i], [xs[i], ys[i], style[i]]);
+    for (const id of unpack(data.removed, Int32Array)) agents.delete(id);
+    for (const s of unpack(data.dropped_styles, Int32Array)) delete styles[s];
+
+    const layers = {};
+    for (const [x, y, s] of agents.values()) {
+      // drawLayer modifies portrayals in place, so draw copies
+      const p = Object.assign({}, styles[s], { x: x, y: y });
+      (layers[p.Layer] = layers[p.Layer] || []).push(p);
+    }
+    return layers;
+  };
+
+  const applyCells = (data) => {
+    if (data.full) cells = new Uint8Array(grid_width * grid_height).fill(EMPTY_CELL);
+    const indices = unpack(data.cells, Int32Array);
+    const values = unpack(data.values, Uint8Array);
+    for (let i = 0; i < indices.length; i++) cells[indices[i]] = values[i];
+
+    const layer = [];
+    for (let i = 0; i < cells.length; i++) {
+      if (cells[i] === EMPTY_CELL) continue;
+      const f = cells[i] / 254;
+      layer.push({
+        Shape: "rect", w: 1, h: 1, Filled: "true", Layer: 0,
+        x: Math.floor(i / data.height), y: i % data.height,
+        Color: `rgb(${Math.round(255 * f)}, ${Math.round(255 * (1 - f))}, 0)`,
+      });
+    }
+    return { 0: layer };
+  };
+
+  this.render = (data) => {
+    const layers = data.mode === "cells" ? applyCells(data) : applyAgents(data);
+    canvasDraw.resetCanvas();
+    for (const layer in layers) canvasDraw.drawLayer(layers[layer]);
+    canvasDraw.drawGridLines("#eee");
+  };
+
+  this.reset = () => {
+    styles = {};
+    agents = new Map();
+    cells = new Uint8Array(0);
+    canvasDraw.resetCanvas();
+  };
+};
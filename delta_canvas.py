@@ -0,0 +1,178 @@
+# delta_canvas.py
+
+import base64
+import json
+import os
+import weakref
+
+import numpy as np
+from mesa.visualization.ModularVisualization import ModularServer, SocketHandler
+from mesa.visualization.modules import CanvasGrid
+
+# Cell value sent for cells without agents in the heat map
+EMPTY_CELL = 255
+
+
+def _pack(values, dtype=np.int32):
+    """Little-endian bytes of an array, base64-encoded for the websocket"""
+    return base64.b64encode(np.asarray(values, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()).decode()
+
+
+class _ClientState:
+    """What one browser connection has been sent so far"""
+
+    def __init__(self):
+        self.model = None
+        self.mode = None
+        self.frames = 0
+        self.styles = {}
+        self.next_style = 0
+        self.used_styles = 0
+        self.agents = {}
+        self.cells = None
+
+
+class DeltaCanvasGrid(CanvasGrid):
+    """CanvasGrid that sends frame deltas instead of every portrayal.
+
+    Portrayals are deduplicated into a style table, which drops styles that
+    are no longer in use, and each frame only sends agents whose cell or
+    style changed (plus removed ids) as packed int32 arrays. Above `aggregate_above` agents, the grid is drawn as a heat map of
+    the misinformed fraction per cell instead, again sending only the cells
+    whose value changed. A full frame is sent for a new model, when the mode
+    switches, and every `keyframe_interval` frames so clients can resync.
+
+    Deltas are relative to what a particular connection was sent, so the
+    sent state is kept per client; DeltaModularServer passes the connection
+    to render(). Without one, all renders share a single state.
+    """
+
+    package_includes = ["GridDraw.js", "InteractionHandler.js"]
+    local_includes = ["delta_canvas.js"]
+    local_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def __init__(self, portrayal_method, grid_width, grid_height, canvas_width=500, canvas_height=500,
+                 aggregate_above=2000, keyframe_interval=100):
+        super().__init__(portrayal_method, grid_width, grid_height, canvas_width, canvas_height)
+        self.aggregate_above = aggregate_above
+        self.keyframe_interval = keyframe_interval
+        self.js_code = "elements.push(new DeltaCanvasModule({}, {}, {}, {}));".format(
+            canvas_width, canvas_height, grid_width, grid_height
+        )
+        self._shared_client = _ClientState()
+        self._clients = weakref.WeakKeyDictionary()
+
+    def render(self, model, client=None):
+        if client is None:
+            sent = self._shared_client
+        else:
+            sent = self._clients.get(client)
+            if sent is None:
+                # A new or reconnected client starts from a full frame
+                sent = self._clients[client] = _ClientState()
+        mode = "cells" if len(model.schedule.agents) > self.aggregate_above else "agents"
+        full = model is not sent.model or mode != sent.mode or sent.frames % self.keyframe_interval == 0
+        sent.model = model
+        sent.mode = mode
+        sent.frames += 1
+        if mode == "cells":
+            return self.render_cells(model, full, sent)
+        return self.render_agents(model, full, sent)
+
+    def render_agents(self, model, full, sent):
+        """Agents whose cell or portrayal changed since the last frame"""
+        if full:
+            sent.styles = {}
+            sent.next_style = 0
+            sent.used_styles = 0
+            sent.agents = {}
+        styles = sent.styles
+        new_styles = {}
+        current = {}
+        for agent in model.schedule.agents:
+            if agent.pos is None:
+                continue
+            portrayal = self.portrayal_method(agent)
+            if not portrayal:
+                continue
+            key = tuple(sorted(portrayal.items()))
+            try:
+                style = styles.get(key)
+            except TypeError:
+                # Unhashable values, e.g. a list of colors
+                key = json.dumps(portrayal, sort_keys=True)
+                style = styles.get(key)
+            if style is None:
+                style = styles[key] = sent.next_style
+                sent.next_style += 1
+                new_styles[style] = portrayal
+            current[agent.unique_id] = (agent.pos[0], agent.pos[1], style)
+
+        changed = [(uid, *state) for uid, state in current.items() if sent.agents.get(uid) != state]
+        removed = [uid for uid in sent.agents if uid not in current]
+        sent.agents = current
+        # Portrayals with continuous values (an influencer's size) make new
+        # styles every frame, so once the table has doubled since the last
+        # pruning, styles no agent uses any more are dropped here and on the
+        # client
+        dropped = []
+        if len(styles) > 2 * sent.used_styles + 64:
+            used = {state[2] for state in current.values()}
+            dropped = [style for style in styles.values() if style not in used]
+            sent.styles = {key: style for key, style in styles.items() if style in used}
+            sent.used_styles = len(sent.styles)
+        columns = np.array(changed, dtype=np.int32).reshape(-1, 4).T
+        return {
+            "mode": "agents",
+            "full": full,
+            "styles": new_styles,
+            "ids": _pack(columns[0]),
+            "x": _pack(columns[1]),
+            "y": _pack(columns[2]),
+            "style": _pack(columns[3]),
+            "removed": _pack(removed),
+            "dropped_styles": _pack(dropped),
+        }
+
+    def render_cells(self, model, full, sent):
+        """Misinformed fraction per cell, quantized to 0-254, for the cells
+        whose value changed since the last frame"""
+        grid = model.grid
+        agents = grid.agent_counts.ravel()
+        fraction = grid.misinformed_counts.ravel() / np.maximum(agents, 1)
+        values = np.where(agents > 0, np.rint(fraction * 254), EMPTY_CELL).astype(np.uint8)
+        if full or sent.cells is None:
+            cells = np.arange(values.size)
+        else:
+            cells = np.flatnonzero(values != sent.cells)
+        sent.cells = values
+        return {
+            "mode": "cells",
+            "full": full,
+            "height": grid.height,
+            "cells": _pack(cells),
+            "values": _pack(values[cells], np.uint8),
+        }
+
+
+class DeltaSocketHandler(SocketHandler):
+    """Websocket handler that renders the model for its own connection"""
+
+    @property
+    def viz_state_message(self):
+        return {"type": "viz_state", "data": self.application.render_model(client=self)}
+
+
+class DeltaModularServer(ModularServer):
+    """ModularServer whose DeltaCanvasGrid elements track each connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Added host rules are matched before the default handlers
+        self.add_handlers(r".*", [(r"/ws", DeltaSocketHandler)])
+
+    def render_model(self, client=None):
+        return [
+            element.render(self.model, client) if isinstance(element, DeltaCanvasGrid) else element.render(self.model)
+            for element in self.visualization_elements
+        ]
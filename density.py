@@ -0,0 +1,69 @@
+# density.py
+
+import numpy as np
+
+# Same order as UserAgent.move_towards_misinformation always probed them, so
+# ties still go to the first direction in this list
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, 1), (1, -1), (-1, -1)]
+
+
+def box_blur(field, radius):
+    """Sum of a (width, height) field over a (2r+1)^2 box around every cell,
+    wrapping at the edges; done separably, one axis at a time"""
+    for axis in (0, 1):
+        blurred = field.copy()
+        for shift in range(1, radius + 1):
+            blurred += np.roll(field, shift, axis=axis) + np.roll(field, -shift, axis=axis)
+        field = blurred
+    return field
+
+
+class MisinformationDensity:
+    """Smoothed misinformed-agent density over the torus.
+
+    The grid's misinformed counts are box-blurred `passes` times, which
+    approximates a Gaussian with a reach of radius * passes cells. For every
+    cell the uphill neighbor is stored too, so a seeking agent's move is one
+    array lookup. The field is rebuilt at most once per tick, the first time
+    an agent asks for it.
+    """
+
+    def __init__(self, model, radius=3, passes=2):
+        self.model = model
+        self.radius = radius
+        self.passes = passes
+        self.step = None
+        self.field = None
+        self.uphill_direction = None
+
+    def update(self):
+        grid = self.model.grid
+        field = grid.misinformed_counts.astype(float)
+        for _ in range(self.passes):
+            field = box_blur(field, self.radius)
+        # neighbors[i, x, y] is the density one step in DIRECTIONS[i] from (x, y)
+        neighbors = np.stack([np.roll(field, (-dx, -dy), axis=(0, 1)) for dx, dy in DIRECTIONS])
+        best = neighbors.argmax(axis=0)
+        uphill = np.take_along_axis(neighbors, best[None], axis=0)[0] > field
+        self.field = field
+        self.uphill_direction = np.where(uphill, best, -1)
+        self.step = self.model.step_count
+
+    def _refresh(self):
+        if self.step != self.model.step_count:
+            self.update()
+
+    def value(self, pos):
+        """Smoothed misinformation density at a cell"""
+        self._refresh()
+        return self.field[pos]
+
+    def uphill(self, pos):
+        """The adjacent cell with the highest density if it is denser than pos,
+        otherwise None"""
+        self._refresh()
+        direction = self.uphill_direction[pos]
+        if direction < 0:
+            return None
+        dx, dy = DIRECTIONS[direction]
+        return ((pos[0] + dx) % self.model.grid.width, (pos[1] + dy) % self.model.grid.height)
@@ -0,0 +1,253 @@
+# distributed.py
+
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from counter_rng import CounterRNG
+from vectorized import neighborhood_sum, wrapped_offsets
+
+
+def _attach(name, shape, dtype):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _tile_worker(tile, spec, barrier):
+    """Step the agents of one tile until the coordinator sets the stop flag.
+
+    Each tick reads the tile's rows of the shared believer grid plus `halo`
+    rows on either side (written by the neighboring tiles at the end of the
+    previous tick), updates its agents, and then publishes its own rows and
+    its reporter partial sums.
+
+    A worker that fails aborts the barrier so the coordinator raises instead
+    of waiting for it; if the coordinator or another tile gives up, the
+    broken barrier ends this worker too.
+    """
+    width, height, halo = spec["width"], spec["height"], spec["halo"]
+    timeout = spec["timeout"]
+    x0, x1 = tile["x0"], tile["x1"]
+    blocks = []
+    views = {}
+    for key in ("counts", "believes", "changed", "partials", "ready", "control"):
+        block, view = _attach(*spec[key])
+        blocks.append(block)
+        views[key] = view
+    counts, believes, changed = views["counts"], views["believes"], views["changed"]
+    partials, control = views["partials"], views["control"]
+
+    index = tile["index"]
+    local_x = tile["x"] - x0 + halo
+    y = tile["y"]
+    critical_thinking = tile["critical_thinking"]
+    total = tile["total_neighbors"]
+    rows = np.arange(x0 - halo, x1 + halo) % width
+    offsets = wrapped_offsets(width, height)
+    counter_rng = CounterRNG(spec["seed"])
+
+    try:
+        views["ready"][tile["tile"]] = 1
+        while True:
+            # No timeout here: the coordinator may idle for any time between ticks
+            barrier.wait()  # Tick starts
+            if control[1]:
+                break
+            step = int(control[0])
+
+            # Halo exchange: the window includes the neighboring tiles' border rows
+            window = counts[rows]
+            misinformation_count = neighborhood_sum(window, offsets)[local_x, y]
+            informed_count = total - misinformation_count
+            current = believes[index]
+
+            draw = counter_rng.uniforms(step, tile["unique_id"])
+            chance = np.divide(misinformation_count, total, out=np.zeros(len(total)), where=total > 0)
+            adopt = ~current & (draw < chance * (1 - critical_thinking))
+            reject = current & (informed_count > misinformation_count) & (draw < critical_thinking)
+            flipped = adopt | reject
+
+            barrier.wait(timeout)  # Every tile has read its halo before any tile writes
+            updated = current ^ flipped
+            believes[index] = updated
+            changed[index] = flipped
+            band = np.bincount((tile["x"] - x0) * height + y, weights=updated, minlength=(x1 - x0) * height)
+            counts[x0:x1] = band.reshape(x1 - x0, height)
+            partials[tile["tile"]] = int(updated.sum())
+            barrier.wait(timeout)  # Tick done
+    except threading.BrokenBarrierError:
+        pass  # Someone else failed or gave up; the coordinator reports it
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        for block in blocks:
+            block.close()
+
+
+class TiledNaturalSpreadEngine:
+    """Natural spread split over worker processes, one tile of the torus each.
+
+    The grid is cut into bands of rows along x. Each worker owns the agents
+    in its band and exchanges border rows `halo` wide through a shared
+    believer-count grid every tick; the misinformed total is reduced from
+    per-tile partial sums. Draws come from the counter-based RNG, so results
+    are bit-identical to the vectorized engine in counter mode however many
+    workers are used.
+
+    The halo must cover the largest interaction radius. Natural spread only
+    looks at the Moore neighborhood, so the default is 1. Normal agents never
+    move, so no agents migrate between tiles.
+
+    A worker that dies or fails, or a tick that takes longer than `timeout`
+    seconds, stops the engine with a RuntimeError rather than leaving the
+    coordinator waiting on the barrier.
+    """
+
+    name = "tiled"
+
+    def __init__(self, model, workers=None, halo=1, timeout=60.0):
+        self.model = model
+        self.width = width = model.grid.width
+        self.height = height = model.grid.height
+        self.agents = list(model.schedule.agents)
+        for agent in self.agents:
+            if agent.agent_type != "normal":
+                raise ValueError("The tiled engine only supports normal agents")
+        if halo < 1:
+            raise ValueError("The halo must be at least one row wide")
+        workers = min(workers or os.cpu_count() or 1, width // halo)
+        if width < 3 or workers < 1:
+            raise ValueError("The grid is too narrow to split into tiles")
+        self.workers = workers
+        self.timeout = timeout
+        self.counter_rng = model.counter_rng or CounterRNG(model.random.getrandbits(64))
+
+        n = len(self.agents)
+        x = np.fromiter((a.pos[0] for a in self.agents), dtype=np.intp, count=n)
+        y = np.fromiter((a.pos[1] for a in self.agents), dtype=np.intp, count=n)
+        believes = np.fromiter((a.believes_misinformation for a in self.agents), dtype=bool, count=n)
+        critical_thinking = np.fromiter((a.critical_thinking for a in self.agents), dtype=float, count=n)
+        unique_id = np.fromiter((a.unique_id for a in self.agents), dtype=np.int64, count=n)
+
+        offsets = wrapped_offsets(width, height)
+        occupancy = np.bincount(x * height + y, minlength=width * height).reshape(width, height)
+        total_neighbors = neighborhood_sum(occupancy, offsets)[x, y]
+
+        self._blocks = []
+        spec = {"width": width, "height": height, "halo": halo, "seed": self.counter_rng.seed, "timeout": timeout}
+        self.counts = self._shared(spec, "counts", (width, height), np.int64)
+        self.believes = self._shared(spec, "believes", (n,), bool)
+        self.changed = self._shared(spec, "changed", (n,), bool)
+        self.partials = self._shared(spec, "partials", (workers,), np.int64)
+        self.ready = self._shared(spec, "ready", (workers,), np.int64)
+        self.control = self._shared(spec, "control", (2,), np.int64)
+        self.believes[:] = believes
+        self.counts[:] = np.bincount(x * height + y, weights=believes, minlength=width * height).reshape(width, height)
+
+        context = multiprocessing.get_context("spawn")
+        self.barrier = context.Barrier(workers + 1)
+        self.processes = []
+        bounds = np.linspace(0, width, workers + 1).astype(int)
+        for tile, (x0, x1) in enumerate(zip(bounds[:-1], bounds[1:])):
+            index = np.flatnonzero((x >= x0) & (x < x1))
+            tile_spec = {
+                "tile": tile, "x0": int(x0), "x1": int(x1), "index": index,
+                "x": x[index], "y": y[index], "unique_id": unique_id[index],
+                "critical_thinking": critical_thinking[index], "total_neighbors": total_neighbors[index],
+            }
+            process = context.Process(target=_tile_worker, args=(tile_spec, spec, self.barrier), daemon=True)
+            process.start()
+            self.processes.append(process)
+        self._finalizer = weakref.finalize(self, _shutdown, self.barrier, self.processes, self._blocks)
+        self._await_workers()
+
+    def _await_workers(self):
+        """Wait until every worker has attached, failing fast if one exits"""
+        deadline = time.monotonic() + self.timeout
+        while not self.ready.all():
+            if any(not process.is_alive() for process in self.processes) or time.monotonic() > deadline:
+                self._fail("did not start")
+            time.sleep(0.01)
+
+    def _wait(self, stage):
+        try:
+            self.barrier.wait(self.timeout)
+        except threading.BrokenBarrierError:
+            # Either a worker aborted the barrier, or the wait timed out
+            self._fail(stage)
+
+    def _fail(self, stage):
+        """Shut down every worker and raise with what went wrong"""
+        exits = ", ".join(
+            f"tile {tile} exited with code {process.exitcode}"
+            for tile, process in enumerate(self.processes) if not process.is_alive()
+        )
+        # A worker killed inside a barrier wait never acknowledges its wakeup,
+        # which would block abort() forever, so the rest are terminated instead
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self.close()
+        raise RuntimeError(f"Tiled engine workers {stage}: " + (exits or f"timed out after {self.timeout}s"))
+
+    def _shared(self, spec, key, shape, dtype):
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        block = shared_memory.SharedMemory(create=True, size=size)
+        self._blocks.append(block)
+        spec[key] = (block.name, shape, dtype)
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def step(self):
+        """Run one tick on every tile and fold the results back into the model"""
+        if not all(process.is_alive() for process in self.processes):
+            self._fail("exited")
+        self.control[0] = self.model.step_count
+        self._wait("failed at tick start")
+        self._wait("failed reading halos")
+        self._wait("failed updating tiles")
+
+        # Reporters come from the tiles' partial sums, and the grid's cell
+        # counts from the shared grid, so agents are updated without setters
+        self.model.tallies.misinformed = int(self.partials.sum())
+        grid = self.model.grid
+        grid.misinformed_counts[:] = self.counts
+        grid._rebuild_tables()
+        for i in np.flatnonzero(self.changed).tolist():
+            agent = self.agents[i]
+            agent._believes_misinformation = bool(self.believes[i])
+            agent.belief = "misinformed" if agent._believes_misinformation else "informed"
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        # Views must be dropped before their shared memory can be closed
+        for name in ("counts", "believes", "changed", "partials", "ready", "control"):
+            self.__dict__.pop(name, None)
+        self._finalizer()
+
+
+def _shutdown(barrier, processes, blocks):
+    # The stop flag goes through the barrier only while every worker is
+    # alive; otherwise the barrier may be unusable and they are terminated
+    if all(process.is_alive() for process in processes):
+        # The control block is always created last
+        control = np.ndarray((2,), dtype=np.int64, buffer=blocks[-1].buf)
+        control[1] = 1
+        del control
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    for block in blocks:
+        block.close()
+        block.unlink()
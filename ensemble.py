@@ -0,0 +1,168 @@
+# ensemble.py
+
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from misinformation_model import run_model
+from recorder import rows_since
+from sweep import parse_grid_size, run_seed
+
+# Two-sided 95% normal quantile; confidence intervals use the normal
+# approximation, which min_replicates keeps reasonable
+Z_95 = 1.959963984540054
+
+
+class EnsembleStats:
+    """Per-step running mean and variance of every reporter column.
+
+    Replicates are folded in one at a time with Welford's update, so memory
+    does not grow with the number of replicates.
+    """
+
+    def __init__(self, columns, steps):
+        self.columns = list(columns)
+        self.steps = steps
+        self.count = 0
+        self.mean = {column: np.zeros(steps) for column in self.columns}
+        self.m2 = {column: np.zeros(steps) for column in self.columns}
+
+    def add(self, series):
+        """Fold in one replicate: a dict of per-step arrays, `steps` long"""
+        self.count += 1
+        for column in self.columns:
+            values = np.asarray(series[column], dtype=float)
+            mean = self.mean[column]
+            delta = values - mean
+            mean += delta / self.count
+            self.m2[column] += delta * (values - mean)
+
+    def variance(self, column):
+        if self.count < 2:
+            return np.full(self.steps, np.nan)
+        return self.m2[column] / (self.count - 1)
+
+    def ci_half_width(self, column, z=Z_95):
+        """Half-width of the confidence interval of the mean at every step"""
+        return z * np.sqrt(self.variance(column) / self.count)
+
+    def summary(self):
+        """Mean, standard deviation and CI half-width per column, one row per step"""
+        data = {"replicates": np.full(self.steps, self.count)}
+        for column in self.columns:
+            data[column + "_mean"] = self.mean[column]
+            data[column + "_std"] = np.sqrt(self.variance(column))
+            data[column + "_ci"] = self.ci_half_width(column)
+        summary = pd.DataFrame(data)
+        summary.index.name = "Step"
+        return summary
+
+
+def run_replicate(params, seed, steps):
+    """Run one replicate and return its reporter series, `steps` rows long.
+
+    A run that stops early has converged, so its final state is carried
+    forward to the full length. The collector records before each step, so
+    that state is read from the reporters once the run has stopped rather
+    than taken from the last recorded row.
+    """
+    model = run_model(params, seed, steps)
+    series = rows_since(model.datacollector, 0)
+    final = {name: reporter(model) for name, reporter in model.datacollector.model_reporters.items()}
+    padded = {}
+    for column, values in series.items():
+        values = np.asarray(values, dtype=float)
+        if len(values) < steps:
+            values = np.concatenate([values, np.full(steps - len(values), float(final[column]))])
+        padded[column] = values[:steps]
+    return padded
+
+
+def run_ensemble(params, steps, target_width, columns=("Misinformed",), min_replicates=5,
+                 max_replicates=1000, base_seed=0, workers=None, pool=None):
+    """Add replicates at one parameter point until the confidence intervals
+    are narrow enough.
+
+    The target is a CI half-width as a fraction of the number of agents,
+    which every step of each column in `columns` must reach. Replicates run
+    in batches of `workers` in parallel; the check happens after each batch.
+    Replicate seeds match sweep.py's, so ensembles and sweeps share runs.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = target_width * params["num_agents"]
+    stats = None
+    replicate = 0
+
+    def batch_results(replicates):
+        seeds = [run_seed(base_seed, params, r) for r in replicates]
+        if pool is None:
+            return [run_replicate(params, seed, steps) for seed in seeds]
+        return list(pool.map(run_replicate, [params] * len(seeds), seeds, [steps] * len(seeds)))
+
+    while replicate < max_replicates:
+        batch = range(replicate, min(replicate + max(workers, 1), max_replicates))
+        for series in batch_results(batch):
+            if stats is None:
+                stats = EnsembleStats(series, steps)
+            stats.add(series)
+        replicate = batch.stop
+        if stats.count >= min_replicates and all(
+            np.nanmax(stats.ci_half_width(column)) <= limit for column in columns
+        ):
+            break
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run adaptive MisinformationModel ensembles")
+    parser.add_argument("--scenarios", nargs="+", default=["natural"])
+    parser.add_argument("--num-agents", nargs="+", type=int, default=[100])
+    parser.add_argument("--num-influencers", nargs="+", type=int, default=[10])
+    parser.add_argument("--grid-sizes", nargs="+", type=parse_grid_size, default=[(10, 10)],
+                        help="Grid sizes as WIDTHxHEIGHT")
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--target", type=float, default=0.01,
+                        help="Target 95%% CI half-width as a fraction of the number of agents")
+    parser.add_argument("--columns", nargs="+", default=["Misinformed"], help="Columns the target applies to")
+    parser.add_argument("--min-replicates", type=int, default=5)
+    parser.add_argument("--max-replicates", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for every point")
+    parser.add_argument("--engine", default="agent", choices=["agent", "vectorized", "tiled"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="ensemble_output")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    workers = args.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool, open(os.path.join(args.out, "points.jsonl"), "a") as index:
+        for scenario, agents, influencers, (width, height) in itertools.product(
+            args.scenarios, args.num_agents, args.num_influencers, args.grid_sizes
+        ):
+            params = {
+                "width": width,
+                "height": height,
+                "num_agents": agents,
+                "num_influencers": influencers,
+                "scenario": scenario,
+                "engine": args.engine,
+            }
+            stats = run_ensemble(
+                params, args.steps, args.target, args.columns, args.min_replicates,
+                args.max_replicates, args.seed, workers, pool,
+            )
+            name = f"{run_seed(args.seed, params, 'ensemble'):016x}.csv"
+            stats.summary().to_csv(os.path.join(args.out, name))
+            widths = {column: float(np.nanmax(stats.ci_half_width(column))) for column in args.columns}
+            index.write(json.dumps({
+                "params": params, "replicates": stats.count, "ci_half_width": widths, "file": name,
+            }) + "\n")
+            print(f"{params}: {stats.count} replicates, CI half-width {widths}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# event_log.py
+
+import atexit
+import json
+import random
+from collections import Counter
+
+
+class EventLog:
+    """Buffered, rate-limited stream of structured simulation events.
+
+    Events are dicts with a step, a kind ("correction", "conversion",
+    "termination", ...) and event-specific fields. They are kept in memory and
+    appended to a JSONL file in bulk; console echo is optional. Each kind can
+    be sampled (sample_rates) and capped per step (max_per_step); events
+    dropped by either are counted in `dropped`. A log with no path and no
+    console output is disabled and emit() returns immediately.
+    """
+
+    def __init__(self, path=None, console=False, sample_rates=None, max_per_step=None, buffer_size=1000, seed=None):
+        self.path = path
+        self.console = console
+        self.sample_rates = dict(sample_rates or {})
+        self.max_per_step = max_per_step
+        self.buffer_size = buffer_size
+        self.enabled = path is not None or console
+        self.buffer = []
+        self.dropped = Counter()
+        self._step = None
+        self._step_counts = Counter()
+        # Sampling must not consume draws from the model's RNG
+        self._random = random.Random(seed)
+        if path is not None:
+            atexit.register(self.flush)
+
+    def emit(self, step, kind, **fields):
+        """Record one event unless sampling or the rate limit drops it"""
+        if not self.enabled:
+            return
+        if step != self._step:
+            self._step = step
+            self._step_counts.clear()
+        rate = self.sample_rates.get(kind, 1.0)
+        if rate < 1.0 and self._random.random() >= rate:
+            self.dropped[kind] += 1
+            return
+        if self.max_per_step is not None and self._step_counts[kind] >= self.max_per_step:
+            self.dropped[kind] += 1
+            return
+        self._step_counts[kind] += 1
+
+        event = {"step": step, "event": kind, **fields}
+        if self.console:
+            details = ", ".join(f"{key}={value}" for key, value in fields.items())
+            print(f"Step {step}: {kind} {details}")
+        if self.path is not None:
+            self.buffer.append(event)
+            if len(self.buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        """Append all buffered events to the sink"""
+        if self.path is None or not self.buffer:
+            return
+        with open(self.path, "a") as sink:
+            sink.write("".join(json.dumps(event) + "\n" for event in self.buffer))
+        self.buffer.clear()
+
+    def discard_after(self, step):
+        """Drop events after `step` from the sink, for a run resumed at that step"""
+        # Summary events written by close() may carry no step
+        self.buffer = [event for event in self.buffer if (event["step"] or 0) <= step]
+        if self.path is None:
+            return
+        try:
+            with open(self.path) as sink:
+                lines = [line for line in sink if (json.loads(line)["step"] or 0) <= step]
+        except FileNotFoundError:
+            return
+        with open(self.path, "w") as sink:
+            sink.writelines(lines)
+
+    def close(self):
+        """Record how many events were dropped and flush everything"""
+        if self.path is not None and self.dropped:
+            self.buffer.append({"step": self._step, "event": "dropped", "counts": dict(self.dropped)})
+        self.flush()
+        if self.path is not None:
+            atexit.unregister(self.flush)
@@ -1,50 +1,204 @@
 # misinformation_model.py
 
+from itertools import chain
+
+import numpy as np
 from mesa import Model
 from mesa.time import RandomActivation
-from mesa.space import MultiGrid
 from mesa.datacollection import DataCollector
-from agent import UserAgent
+from agent import EchoChamberAgent, UserAgent
+from belief_grid import BeliefGrid
+from convergence import ConvergenceMonitor, default_monitor
+from counter_rng import CounterRNG
+from density import MisinformationDensity
+from distributed import TiledNaturalSpreadEngine
+from event_log import EventLog
+from network import NetworkSpreadEngine
+from population import build_population, generate_population, paused_collection
+from profiling import BehaviorProfiler
+from recorder import SeriesRecorder
+from reinforcement import BatchedReinforcement
+from scheduler import TypeStagedActivation
+from tallies import AgentTallies
+from vectorized import NaturalSpreadEngine
+
+MODEL_REPORTERS = {
+    "Informed": lambda m: m.tallies.informed,
+    "Misinformed": lambda m: m.tallies.misinformed,
+    "Fact_Checkers": lambda m: m.tallies.types["fact_checker"],
+    "Influencers": lambda m: m.tallies.types["influencer"],
+    "Echo_Chambers": lambda m: m.tallies.types["echo_chamber"],
+    "Normal_Agents": lambda m: m.tallies.types["normal"],
+    "Total_Influence": lambda m: m.tallies.total_influence,
+    "Average_Critical_Thinking": lambda m: m.tallies.critical_thinking / m.tallies.agents,
+    "Left_Leaning": lambda m: m.tallies.political_sides["left"],
+    "Right_Leaning": lambda m: m.tallies.political_sides["right"],
+    "Neutral": lambda m: m.tallies.political_sides["neutral"],
+    "Political_Total": lambda m: m.tallies.types["political"]
+}
 
 class MisinformationModel(Model):
-    def __init__(self, width=10, height=10, num_agents=100, num_influencers=10, scenario="natural"):
+    def __init__(self, width=10, height=10, num_agents=None, num_influencers=10, scenario="natural", engine="agent", seed=None, record_to=None, activation="random", profile=False, event_log=None, population="sequential", rng="shared", workers=None, network=None, stopping=None, reinforcement="immediate"):
+        if seed is not None:
+            self.reset_randomizer(seed)
+        # On a network there is one agent per node
+        if num_agents is None:
+            num_agents = network.num_nodes if network is not None else 100
+        elif network is not None and num_agents != network.num_nodes:
+            raise ValueError(f"A network of {network.num_nodes} nodes needs {network.num_nodes} agents, not {num_agents}")
         self.num_agents = num_agents
         self.num_influencers = num_influencers
-        self.grid = MultiGrid(width, height, torus=True)
-        self.schedule = RandomActivation(self)
+        # A SocialNetwork replaces the torus with a graph; agents query either
+        # space through the same methods
+        if network is not None:
+            if scenario != "natural":
+                raise ValueError("Network spaces only support the natural scenario")
+            if population == "bulk":
+                raise ValueError("Network spaces do not support the bulk population builder")
+            self.grid = network
+            self.density = None
+        else:
+            self.grid = BeliefGrid(width, height, torus=True)
+            # Shared misinformation density that fact checkers navigate by
+            self.density = MisinformationDensity(self)
+        self.belief_buffer = None  # Collects belief changes under simultaneous activation
+        if activation == "random":
+            self.schedule = RandomActivation(self)
+        elif activation == "staged":
+            self.schedule = TypeStagedActivation(self)
+        elif activation == "simultaneous":
+            self.schedule = TypeStagedActivation(self, simultaneous=True)
+        else:
+            raise ValueError(f"Unknown activation: {activation}")
         self.running = True
         self.scenario = scenario
         self.step_count = 0
+        self.tallies = AgentTallies()
+        self.profiler = None
+        # With rng="counter", agent draws are keyed by (seed, step, agent id,
+        # draw index) instead of coming from the shared self.random
+        if rng == "counter":
+            self.counter_rng = CounterRNG(seed if seed is not None else self.random.getrandbits(64))
+        elif rng == "shared":
+            self.counter_rng = None
+        else:
+            raise ValueError(f"Unknown rng mode: {rng}")
+        # Structured events replace debug prints; the default log is disabled
+        self.events = event_log if event_log is not None else EventLog()
+
+        # Create agents based on scenario; the bulk builder generates the
+        # whole population with NumPy and places it in one pass, and agents
+        # created one by one are counted and placed together at the end
+        self._queued_agents = []
+        with paused_collection():
+            if population == "bulk":
+                self.add_population(scenario)
+            elif population == "empty":
+                pass  # The caller adds the agents, e.g. when restoring a checkpoint
+            elif population != "sequential":
+                raise ValueError(f"Unknown population builder: {population}")
+            elif network is not None:
+                self.create_network_agents()
+            elif scenario == "natural":
+                self.create_natural_spread_agents()
+            elif scenario == "fact_checkers":
+                self.create_fact_checker_agents()
+            elif scenario == "influencers":
+                self.create_influencer_agents()
+            elif scenario == "echo_chamber":
+                self.create_echo_chamber_agents()
+            elif scenario == "political":
+                self.create_political_agents()
+            self.add_queued_agents()
+
+        # Optionally swap the per-agent step for the array-backed engine
+        if engine == "vectorized":
+            if scenario != "natural":
+                raise ValueError("The vectorized engine only supports the natural scenario")
+            self.engine = NetworkSpreadEngine(self) if network is not None else NaturalSpreadEngine(self)
+        elif engine == "tiled":
+            if scenario != "natural" or network is not None:
+                raise ValueError("The tiled engine only supports the natural scenario on a grid")
+            self.engine = TiledNaturalSpreadEngine(self, workers=workers)
+        elif engine == "agent":
+            self.engine = None
+        else:
+            raise ValueError(f"Unknown engine: {engine}")
+
+        # "batched" gathers echo-chamber reinforcement during the step and
+        # applies it once at the end, independent of activation order
+        if reinforcement == "batched":
+            if network is not None:
+                raise ValueError("Batched reinforcement needs a grid space")
+            self.reinforcement = BatchedReinforcement(
+                self,
+                radius=EchoChamberAgent.cluster_radius,
+                strength_gain=EchoChamberAgent.belief_reinforcement * 0.7,
+                critical_thinking_loss=0.05,
+            )
+        elif reinforcement == "immediate":
+            self.reinforcement = None
+        else:
+            raise ValueError(f"Unknown reinforcement mode: {reinforcement}")
+
+        # Per-behavior instrumentation, see profiling.BehaviorProfiler
+        if profile:
+            BehaviorProfiler(self).enable()
+
+        # Set up data collection; with record_to, rows stream to disk in chunks
+        if record_to is not None:
+            self.datacollector = SeriesRecorder(MODEL_REPORTERS, path=record_to)
+        else:
+            self.datacollector = DataCollector(model_reporters=MODEL_REPORTERS)
 
-        # Create agents based on scenario
-        if scenario == "natural":
-            self.create_natural_spread_agents()
-        elif scenario == "fact_checkers":
-            self.create_fact_checker_agents()
-        elif scenario == "influencers":
-            self.create_influencer_agents()
-        elif scenario == "echo_chamber":
-            self.create_echo_chamber_agents()
-        elif scenario == "political":
-            self.create_political_agents()
-
-        # Set up data collection
-        self.datacollector = DataCollector(
-            model_reporters={
-                "Informed": lambda m: sum(1 for a in m.schedule.agents if not a.believes_misinformation),
-                "Misinformed": lambda m: sum(1 for a in m.schedule.agents if a.believes_misinformation),
-                "Fact_Checkers": lambda m: sum(1 for a in m.schedule.agents if a.agent_type == "fact_checker"),
-                "Influencers": lambda m: sum(1 for a in m.schedule.agents if a.agent_type == "influencer"),
-                "Echo_Chambers": lambda m: sum(1 for a in m.schedule.agents if a.agent_type == "echo_chamber"),
-                "Normal_Agents": lambda m: sum(1 for a in m.schedule.agents if a.agent_type == "normal"),
-                "Total_Influence": lambda m: sum(a.influence_count for a in m.schedule.agents if a.agent_type == "influencer"),
-                "Average_Critical_Thinking": lambda m: sum(a.critical_thinking for a in m.schedule.agents) / len(m.schedule.agents),
-                "Left_Leaning": lambda m: sum(1 for a in m.schedule.agents if a.agent_type == "political" and a.political_side == "left"),
-                "Right_Leaning": lambda m: sum(1 for a in m.schedule.agents if a.agent_type == "political" and a.political_side == "right"),
-                "Neutral": lambda m: sum(1 for a in m.schedule.agents if a.agent_type == "political" and a.political_side == "neutral"),
-                "Political_Total": lambda m: sum(1 for a in m.schedule.agents if a.agent_type == "political")
-            }
+        # Early termination is opt-in: "default" uses the scenario's
+        # convergence criteria, or pass a ConvergenceMonitor. With None only
+        # the fact_checkers scenario ends by itself, once nobody is misinformed
+        self.stop_reason = None
+        self.stop_step = None
+        if stopping == "default":
+            self.stopping = default_monitor(scenario)
+        elif stopping is None or isinstance(stopping, ConvergenceMonitor):
+            self.stopping = stopping
+        else:
+            raise ValueError(f"Unknown stopping rule: {stopping}")
+
+    def add_agent(self, agent, pos):
+        """Schedule an agent, count it in the tallies and place it on the grid.
+
+        While the initial population is created, counting and placing are
+        queued for add_queued_agents.
+        """
+        self.schedule.add(agent)
+        if self._queued_agents is not None:
+            self._queued_agents.append((agent, pos))
+            return
+        self.tallies.add(agent)
+        self.grid.place_agent(agent, pos)
+
+    def add_queued_agents(self):
+        """Count and place the queued agents in one pass, in the order they
+        were added"""
+        queued, self._queued_agents = self._queued_agents, None
+        if not queued:
+            return
+        agents = [agent for agent, _ in queued]
+        self.tallies.add_all(agents)
+        if isinstance(self.grid, BeliefGrid):
+            cells = chain.from_iterable(pos for _, pos in queued)
+            xs, ys = np.fromiter(cells, dtype=np.intp, count=2 * len(queued)).reshape(-1, 2).T
+            self.grid.place_agents(agents, xs, ys)
+        else:
+            for agent, pos in queued:
+                self.grid.place_agent(agent, pos)
+
+    def add_population(self, scenario):
+        """Generate and add a scenario's agents in bulk"""
+        rng = np.random.default_rng(self.random.getrandbits(64))
+        population = generate_population(
+            scenario, self.grid.width, self.grid.height, self.num_agents, self.num_influencers, rng
         )
+        build_population(self, population)
 
     def create_natural_spread_agents(self):
         """Create agents for natural spread scenario"""
@@ -52,10 +206,17 @@ class MisinformationModel(Model):
             critical_thinking = self.random.random()
             misinformation = self.random.random() < 0.2  # 20% initial misinformation
             agent = UserAgent(i, self, "normal", critical_thinking, misinformation)
-            self.schedule.add(agent)
             x = self.random.randrange(self.grid.width)
             y = self.random.randrange(self.grid.height)
-            self.grid.place_agent(agent, (x, y))
+            self.add_agent(agent, (x, y))
+
+    def create_network_agents(self):
+        """Create natural spread agents; agent i sits on node i"""
+        for i in range(self.num_agents):
+            critical_thinking = self.random.random()
+            misinformation = self.random.random() < 0.2  # 20% initial misinformation
+            agent = UserAgent(i, self, "normal", critical_thinking, misinformation)
+            self.add_agent(agent, i)
 
     def create_fact_checker_agents(self):
         """Create agents for fact checker scenario"""
@@ -63,24 +224,22 @@ class MisinformationModel(Model):
         num_fact_checkers = max(1, int(self.num_agents * 0.20))
         num_normal_agents = self.num_agents - num_fact_checkers
 
-        print(f"Creating {num_fact_checkers} fact checkers and {num_normal_agents} normal agents")  # Debug print
+        self.events.emit(self.step_count, "setup", fact_checkers=num_fact_checkers, normal_agents=num_normal_agents)
 
         # Create normal agents with higher initial misinformation
         for i in range(num_normal_agents):
             critical_thinking = self.random.random() * 0.4  # Lower critical thinking
             misinformation = self.random.random() < 0.5  # 50% initial misinformation
             agent = UserAgent(i, self, "normal", critical_thinking, misinformation)
-            self.schedule.add(agent)
             # Place normal agents randomly
             x = self.random.randrange(self.grid.width)
             y = self.random.randrange(self.grid.height)
-            self.grid.place_agent(agent, (x, y))
+            self.add_agent(agent, (x, y))
         
         # Add fact checkers with strategic placement
         for i in range(num_normal_agents, self.num_agents):
             # Create fact checker agent
             agent = UserAgent(i, self, "fact_checker")
-            self.schedule.add(agent)
             
             # Place fact checkers in a grid pattern
             fact_checker_index = i - num_normal_agents
@@ -110,8 +269,8 @@ class MisinformationModel(Model):
             y = max(0, min(self.grid.height - 1, y))
             
             # Place the agent
-            self.grid.place_agent(agent, (x, y))
-            print(f"Placed fact checker {i} at position ({x}, {y})")  # Debug print
+            self.add_agent(agent, (x, y))
+            self.events.emit(self.step_count, "placement", agent=i, pos=[x, y])
 
     def create_influencer_agents(self):
         """Create agents for influencer scenario"""
@@ -124,17 +283,15 @@ class MisinformationModel(Model):
             critical_thinking = self.random.random()
             misinformation = self.random.random() < 0.2
             agent = UserAgent(i, self, "normal", critical_thinking, misinformation)
-            self.schedule.add(agent)
             x = self.random.randrange(self.grid.width)
             y = self.random.randrange(self.grid.height)
-            self.grid.place_agent(agent, (x, y))
+            self.add_agent(agent, (x, y))
         
         # Add influencers with strategic placement
         for i in range(num_normal_agents, self.num_agents):
             # Alternate between misinformed and informed influencers
             misinformation = (i % 2 == 0)
             agent = UserAgent(i, self, "influencer", misinformation=misinformation)
-            self.schedule.add(agent)
             
             # Place influencers in a strategic pattern
             if i < num_normal_agents + num_influencers // 2:
@@ -160,7 +317,7 @@ class MisinformationModel(Model):
             x = max(0, min(self.grid.width - 1, x))
             y = max(0, min(self.grid.height - 1, y))
             
-            self.grid.place_agent(agent, (x, y))
+            self.add_agent(agent, (x, y))
 
     def create_echo_chamber_agents(self):
         """Create agents for echo chamber scenario"""
@@ -199,26 +356,86 @@ class MisinformationModel(Model):
                 y = max(0, min(self.grid.height - 1, center_y + self.random.randint(-2, 2)))
                 
                 # Add agent to schedule and grid
-                self.schedule.add(agent)
-                self.grid.place_agent(agent, (x, y))
+                self.add_agent(agent, (x, y))
                 
                 # Initialize cluster center after placement
                 agent.cluster_center = (center_x, center_y)
 
+    def create_political_agents(self):
+        """Create agents for political scenario (left/right/neutral split)"""
+        self.add_population("political")
+
     def step(self):
         """Execute one step of the simulation"""
         self.step_count += 1
         self.datacollector.collect(self)
-        self.schedule.step()
+        if self.engine is not None:
+            self.engine.step()
+            self.schedule.steps += 1
+            self.schedule.time += 1
+        else:
+            self.schedule.step()
+        if self.reinforcement is not None:
+            self.reinforcement.apply()
+        if self.profiler is not None:
+            self.profiler.end_step(self.step_count)
         
-        # Check if simulation should continue
         if self.scenario == "fact_checkers":
             # Count remaining misinformed agents
-            misinformed_count = sum(1 for a in self.schedule.agents if a.believes_misinformation)
-            fact_checker_count = sum(1 for a in self.schedule.agents if a.agent_type == "fact_checker")
-            print(f"Step {self.step_count}: Misinformed agents: {misinformed_count}, Fact checkers: {fact_checker_count}")
-            
-            if misinformed_count == 0:
-                self.running = False
-            # Add debug print
-            print(f"Step {self.step_count}: Misinformed agents: {misinformed_count}")
+            misinformed_count = self.tallies.misinformed
+            fact_checker_count = self.tallies.types["fact_checker"]
+            self.events.emit(self.step_count, "step_summary", misinformed=misinformed_count, fact_checkers=fact_checker_count)
+            if misinformed_count == 0 and self.running:
+                self.stop("no_misinformed_agents")
+
+        # Check if simulation should continue
+        if self.stopping is not None and self.running:
+            reason = self.stopping.check(self)
+            if reason is not None:
+                self.stop(reason)
+
+    def stop(self, reason):
+        """End the run, recording why and at which step"""
+        self.running = False
+        self.stop_reason = reason
+        self.stop_step = self.step_count
+        self.events.emit(self.step_count, "termination", reason=reason)
+        self.flush()
+
+    def flush(self):
+        """Write out recorder rows and events still held in memory.
+
+        Stopping flushes automatically; call this at the end of a run that
+        ends without a stop, such as one capped at a number of steps.
+        """
+        if isinstance(self.datacollector, SeriesRecorder):
+            self.datacollector.close()
+        self.events.flush()
+
+    def close(self):
+        """Flush the outputs and release what the model holds outside itself:
+        the tiled engine's worker processes and shared memory, and the
+        profiler's method wrappers. The model cannot be stepped afterwards
+        if its engine had workers.
+        """
+        self.flush()
+        if hasattr(self.engine, "close"):
+            self.engine.close()
+        if self.profiler is not None:
+            self.profiler.disable()
+
+
+def run_model(params, seed, steps, **options):
+    """Run a model for up to `steps` steps and return it, closed.
+
+    This is the loop the batch runners share: runs stop once they converge
+    unless the params choose another stopping rule, and the engine is closed
+    even if a step fails. `options` go to the constructor with the params.
+    """
+    model = MisinformationModel(**{"stopping": "default", **params}, seed=seed, **options)
+    try:
+        while model.running and model.step_count < steps:
+            model.step()
+    finally:
+        model.close()
+    return model
@@ -0,0 +1,203 @@
+# network.py
+
+import numpy as np
+
+from vectorized import NaturalSpreadEngine
+
+
+def csr_from_edges(sources, targets, num_nodes=None, directed=False):
+    """Build (indptr, indices) adjacency arrays from an edge list.
+
+    Undirected graphs store every edge in both directions. Self loops and
+    repeated edges are dropped, and each row's neighbors are sorted.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if num_nodes is None:
+        num_nodes = int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+    if not directed:
+        sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+    keep = sources != targets
+    codes = np.sort(sources[keep] * num_nodes + targets[keep])
+    codes = codes[np.concatenate([[True], codes[1:] != codes[:-1]])]
+    rows, indices = np.divmod(codes, num_nodes)
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_nodes), out=indptr[1:])
+    return indptr, indices
+
+
+def gather_rows(indptr, indices, rows):
+    """Concatenated neighbor lists of the given rows, and each row's degree"""
+    starts = indptr[rows]
+    degrees = indptr[rows + 1] - starts
+    # Position k of the output reads indices[starts[row] + k - row offset]
+    offsets = np.repeat(starts - np.cumsum(degrees) + degrees, degrees)
+    return indices[offsets + np.arange(offsets.size)], degrees
+
+
+def load_edge_list(path, num_nodes=None, directed=False):
+    """Read a whitespace-separated edge list ("source target" per line, # for
+    comments) into a SocialNetwork"""
+    edges = np.loadtxt(path, dtype=np.int64, comments="#", ndmin=2)
+    return SocialNetwork(*csr_from_edges(edges[:, 0], edges[:, 1], num_nodes, directed), directed=directed)
+
+
+def scale_free_network(num_nodes, edges_per_node=3, rng=None):
+    """Barabasi-Albert preferential attachment graph.
+
+    Uses the Batagelj-Brandes edge-copy formulation: edge e of node v links v
+    to the endpoint stored at a uniformly drawn earlier slot, which picks
+    nodes in proportion to their degree. Slots that hold copies are resolved
+    by pointer jumping, so generation is vectorized.
+    """
+    rng = np.random.default_rng(rng)
+    num_edges = num_nodes * edges_per_node
+    slot = np.arange(2 * num_edges)
+    # Slot 2e + 1 copies slot pick[e], drawn from the slots filled before it
+    pick = (rng.random(num_edges) * (slot[1::2])).astype(np.int64)
+    target = pick
+    copies = target % 2 == 1
+    while copies.any():
+        target = np.where(copies, pick[target // 2], target)
+        copies = target % 2 == 1
+    sources = np.arange(num_edges) // edges_per_node
+    targets = (target // 2) // edges_per_node
+    return SocialNetwork(*csr_from_edges(sources, targets, num_nodes))
+
+
+def small_world_network(num_nodes, neighbors=4, rewire=0.1, rng=None):
+    """Watts-Strogatz graph: a ring where every node links to `neighbors`
+    nearest nodes, with each edge rewired to a random node with probability
+    `rewire`"""
+    rng = np.random.default_rng(rng)
+    sources = np.repeat(np.arange(num_nodes), neighbors // 2)
+    targets = (sources + np.tile(np.arange(1, neighbors // 2 + 1), num_nodes)) % num_nodes
+    rewired = rng.random(sources.size) < rewire
+    targets[rewired] = rng.integers(0, num_nodes, int(rewired.sum()))
+    return SocialNetwork(*csr_from_edges(sources, targets, num_nodes))
+
+
+class SocialNetwork:
+    """Graph space with compressed sparse row adjacency.
+
+    A drop-in for BeliefGrid where positions are node ids: nodes hold lists
+    of agents, per-node belief counts are kept up to date by the agents'
+    setters, and radius queries walk adjacency slices (radius is the number
+    of hops). `neighbor_sum` is the sparse matrix-vector product used by the
+    network spread engine.
+    """
+
+    def __init__(self, indptr, indices, directed=False):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.num_nodes = len(self.indptr) - 1
+        self._nodes = [[] for _ in range(self.num_nodes)]
+        self.misinformed_counts = np.zeros(self.num_nodes, dtype=np.int64)
+        self.agent_counts = np.zeros(self.num_nodes, dtype=np.int64)
+        # Row of every stored edge, for the bincount-based product
+        self._rows = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        self.directed = directed
+        # An undirected graph is its own transpose
+        self._reverse = None if directed else (self.indptr, self.indices)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def adjacent(self, node):
+        """Neighbor node ids of a node, as a slice of the adjacency array"""
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def reverse(self):
+        """Adjacency of the transposed graph (who lists each node as a neighbor)"""
+        if self._reverse is None:
+            self._reverse = csr_from_edges(self.indices, self._rows, self.num_nodes, directed=True)
+        return self._reverse
+
+    def neighbor_sum(self, values):
+        """Sum a per-node array over every node's neighbors"""
+        return np.bincount(self._rows, weights=values[self.indices], minlength=self.num_nodes)
+
+    def place_agent(self, agent, pos):
+        """Place the agent on a node and count it there"""
+        self._nodes[pos].append(agent)
+        agent.pos = pos
+        self.misinformed_counts[pos] += agent.believes_misinformation
+        self.agent_counts[pos] += 1
+
+    def remove_agent(self, agent):
+        node = agent.pos
+        self._nodes[node].remove(agent)
+        agent.pos = None
+        self.misinformed_counts[node] -= agent.believes_misinformation
+        self.agent_counts[node] -= 1
+
+    def move_agent(self, agent, pos):
+        self.remove_agent(agent)
+        self.place_agent(agent, pos)
+
+    def update_belief(self, agent):
+        """Record that a placed agent flipped its belief"""
+        self.misinformed_counts[agent.pos] += 1 if agent.believes_misinformation else -1
+
+    def _hop_nodes(self, node, radius, include_center):
+        """Node ids within `radius` hops of a node"""
+        if radius == 1:
+            nodes = self.adjacent(node)
+        else:
+            seen = np.zeros(self.num_nodes, dtype=bool)
+            seen[node] = True
+            frontier = np.array([node])
+            for _ in range(radius):
+                frontier, _ = gather_rows(self.indptr, self.indices, frontier)
+                frontier = np.unique(frontier[~seen[frontier]])
+                seen[frontier] = True
+            seen[node] = False
+            nodes = np.flatnonzero(seen)
+        if include_center:
+            nodes = np.append(nodes, node)
+        return nodes
+
+    def get_neighborhood(self, pos, moore=True, include_center=False, radius=1):
+        return self._hop_nodes(pos, radius, include_center).tolist()
+
+    def get_neighbors(self, pos, moore=True, include_center=False, radius=1):
+        return [agent for node in self._hop_nodes(pos, radius, include_center).tolist() for agent in self._nodes[node]]
+
+    def count_misinformed(self, pos, radius=1, include_center=False):
+        """Number of misinformed agents within radius hops of a node"""
+        return int(self.misinformed_counts[self._hop_nodes(pos, radius, include_center)].sum())
+
+    def count_agents(self, pos, radius=1, include_center=False):
+        """Number of agents within radius hops of a node"""
+        return int(self.agent_counts[self._hop_nodes(pos, radius, include_center)].sum())
+
+    def count_informed(self, pos, radius=1, include_center=False):
+        nodes = self._hop_nodes(pos, radius, include_center)
+        return int(self.agent_counts[nodes].sum() - self.misinformed_counts[nodes].sum())
+
+    def misinformed_at(self, pos):
+        return int(self.misinformed_counts[pos])
+
+
+class NetworkSpreadEngine(NaturalSpreadEngine):
+    """NaturalSpreadEngine on a SocialNetwork: believer counts around every
+    node come from one sparse matrix-vector product, and flips are pushed to
+    the nodes that list the flipped agent's node as a neighbor"""
+
+    def setup_space(self):
+        self.network = self.model.grid
+        return np.fromiter((a.pos for a in self.agents), dtype=np.int64, count=len(self.agents))
+
+    def neighbor_field(self, weights):
+        counts = np.bincount(self.cell, weights=weights, minlength=self.network.num_nodes)
+        return self.network.neighbor_sum(counts).astype(np.int64)
+
+    def spread_changes(self, flipped, misinformed_field):
+        delta = np.where(self.believes_misinformation[flipped], 1, -1)
+        indptr, indices = self.network.reverse()
+        rows, degrees = gather_rows(indptr, indices, self.cell[flipped])
+        np.add.at(misinformed_field, rows, np.repeat(delta, degrees))
@@ -0,0 +1,205 @@
+# population.py
+
+import gc
+from contextlib import contextmanager
+
+import numpy as np
+
+from agent import AGENT_CLASSES
+
+# Share of political agents on each side
+POLITICAL_SPLIT = {"left": 0.4, "right": 0.4, "neutral": 0.2}
+
+
+@contextmanager
+def paused_collection():
+    """Pause the cyclic garbage collector while a population is created.
+
+    Every agent lives as long as the model, so collections triggered by the
+    allocations would only rescan them over and over.
+    """
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def strategic_positions(count, width, height):
+    """Positions for fact checkers and influencers: half near the center,
+    the rest cycling through the four corners"""
+    index = np.arange(count)
+    half = count // 2
+    corner = (index - half) % 4
+    corner_x = np.where(corner % 2 == 0, 1, width - 2)
+    corner_y = np.where(corner < 2, 1, height - 2)
+    x = np.where(index < half, width // 2 + index % 3 - 1, corner_x)
+    y = np.where(index < half, height // 2 + index // 3, corner_y)
+    return np.clip(x, 0, width - 1), np.clip(y, 0, height - 1)
+
+
+def _population(agent_type, critical_thinking, misinformation, x, y):
+    return {
+        "agent_type": np.asarray(agent_type, dtype=object),
+        "critical_thinking": np.asarray(critical_thinking, dtype=float),
+        "misinformation": np.asarray(misinformation, dtype=bool),
+        "x": np.asarray(x, dtype=np.intp),
+        "y": np.asarray(y, dtype=np.intp),
+    }
+
+
+def _concat(*populations):
+    return {key: np.concatenate([p[key] for p in populations]) for key in populations[0]}
+
+
+def _normal_agents(rng, count, width, height, critical_scale=1.0, misinformation_rate=0.2):
+    return _population(
+        np.full(count, "normal", dtype=object),
+        rng.random(count) * critical_scale,
+        rng.random(count) < misinformation_rate,
+        rng.integers(0, width, count),
+        rng.integers(0, height, count),
+    )
+
+
+def generate_population(scenario, width, height, num_agents, num_influencers, rng):
+    """Generate every agent's type, belief, critical thinking and position in
+    one pass, following the same distributions as the model's create_*_agents
+    methods. Returns a dict of agent-aligned arrays; index i becomes the agent
+    with unique_id i."""
+    if scenario == "natural":
+        return _normal_agents(rng, num_agents, width, height)
+
+    if scenario == "fact_checkers":
+        num_fact_checkers = max(1, int(num_agents * 0.20))
+        normal = _normal_agents(rng, num_agents - num_fact_checkers, width, height, 0.4, 0.5)
+        x, y = strategic_positions(num_fact_checkers, width, height)
+        checkers = _population(
+            np.full(num_fact_checkers, "fact_checker", dtype=object),
+            np.ones(num_fact_checkers), np.zeros(num_fact_checkers, dtype=bool), x, y,
+        )
+        return _concat(normal, checkers)
+
+    if scenario == "influencers":
+        count = min(num_influencers, num_agents - 1)  # Ensure at least one normal agent
+        num_normal_agents = num_agents - count
+        normal = _normal_agents(rng, num_normal_agents, width, height)
+        x, y = strategic_positions(count, width, height)
+        # Alternate between misinformed and informed influencers
+        influencers = _population(
+            np.full(count, "influencer", dtype=object),
+            rng.random(count), (np.arange(num_normal_agents, num_agents) % 2) == 0, x, y,
+        )
+        return _concat(normal, influencers)
+
+    if scenario == "echo_chamber":
+        cluster_size = num_agents // 4
+        cluster = np.repeat(np.arange(4), cluster_size)
+        center_x = np.where(cluster % 2 == 0, width // 4, 3 * width // 4)
+        center_y = np.where(cluster < 2, height // 4, 3 * height // 4)
+        population = _population(
+            np.full(len(cluster), "echo_chamber", dtype=object),
+            np.maximum(0.1, rng.random(len(cluster)) * 0.3),  # EchoChamberAgent's minimum
+            cluster < 2,  # Top clusters start misinformed
+            np.clip(center_x + rng.integers(-2, 3, len(cluster)), 0, width - 1),
+            np.clip(center_y + rng.integers(-2, 3, len(cluster)), 0, height - 1),
+        )
+        population["cluster_x"] = center_x
+        population["cluster_y"] = center_y
+        return population
+
+    if scenario == "political":
+        sides = np.array(list(POLITICAL_SPLIT), dtype=object)
+        side = sides[rng.choice(len(sides), size=num_agents, p=list(POLITICAL_SPLIT.values()))]
+        partisan = side != "neutral"
+        # Partisans think less critically and start in their own half of the grid
+        x = rng.integers(0, width, num_agents)
+        x = np.where(side == "left", x // 2, np.where(side == "right", width // 2 + x // 2, x))
+        population = _population(
+            np.full(num_agents, "political", dtype=object),
+            rng.random(num_agents) * np.where(partisan, 0.6, 1.0),
+            rng.random(num_agents) < np.where(partisan, 0.3, 0.1),
+            np.clip(x, 0, width - 1),
+            rng.integers(0, height, num_agents),
+        )
+        population["political_side"] = side
+        return population
+
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+# Attributes set per agent from the population arrays instead of copied
+# from a template agent
+_POPULATION_FIELDS = {
+    "unique_id", "model", "pos", "_tallied", "_critical_thinking", "_believes_misinformation", "belief",
+    "_political_side", "cluster_center",
+}
+
+
+def _initial_fields(agent_type, model):
+    """(name, value) of every attribute a new agent of this type starts with,
+    read off one agent built through the regular constructor"""
+    template = AGENT_CLASSES[agent_type](-1, model, agent_type, 0.0, False)
+    fields = [(name, value) for name, value in vars(template).items() if name not in _POPULATION_FIELDS]
+    for cls in type(template).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if name not in _POPULATION_FIELDS and hasattr(template, name):
+                fields.append((name, getattr(template, name)))
+    return fields
+
+
+def _count_tallies(tallies, population):
+    """Add a population's aggregates to the model's tallies in one pass"""
+    agent_type = population["agent_type"]
+    tallies.agents += len(agent_type)
+    tallies.misinformed += int(population["misinformation"].sum())
+    tallies.types.update(agent_type.tolist())
+    sides = population.get("political_side")
+    if sides is not None:
+        tallies.political_sides.update(sides[agent_type == "political"].tolist())
+    # New influencers start with no influence, so total_influence is unchanged
+    tallies.critical_thinking += float(population["critical_thinking"].sum())
+
+
+def build_population(model, population):
+    """Create the agents described by a population and add them to the model,
+    placing them on the grid in one bulk pass.
+
+    Agents are not built through their constructors: each one gets its
+    type's starting attributes copied in and its own values written straight
+    to the slots, and the tallies are counted from the arrays.
+    """
+    agent_types = population["agent_type"]
+    fields = {agent_type: _initial_fields(agent_type, model) for agent_type in set(agent_types.tolist())}
+    sides = population.get("political_side")
+    cluster_x, cluster_y = population.get("cluster_x"), population.get("cluster_y")
+    columns = zip(
+        agent_types.tolist(),
+        population["critical_thinking"].tolist(),
+        population["misinformation"].tolist(),
+    )
+    new = object.__new__
+    add = model.schedule.add
+    agents = []
+    for unique_id, (agent_type, critical_thinking, misinformation) in enumerate(columns):
+        agent = new(AGENT_CLASSES[agent_type])
+        agent.unique_id = unique_id
+        agent.model = model
+        agent.pos = None
+        agent._tallied = True
+        agent._critical_thinking = critical_thinking
+        agent._believes_misinformation = misinformation
+        agent.belief = "misinformed" if misinformation else "informed"
+        for name, value in fields[agent_type]:
+            setattr(agent, name, value)
+        if sides is not None:
+            agent._political_side = sides[unique_id]
+        if cluster_x is not None:
+            agent.cluster_center = (int(cluster_x[unique_id]), int(cluster_y[unique_id]))
+        add(agent)
+        agents.append(agent)
+    _count_tallies(model.tallies, population)
+    model.grid.place_agents(agents, population["x"], population["y"], population["misinformation"])
+    return agents
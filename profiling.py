@@ -0,0 +1,146 @@
+# profiling.py
+
+import functools
+import time
+import weakref
+
+import pandas as pd
+
+from agent import AGENT_CLASSES
+
+# Agent methods whose calls and wall time are recorded
+BEHAVIORS = [
+    "normal_step",
+    "fact_checker_step",
+    "influencer_step",
+    "echo_chamber_step",
+    "political_step",
+    "move_towards_misinformation",
+    "move_to_center",
+    "move_towards_similar",
+    "return_to_cluster",
+    "get_similar_neighbors",
+]
+
+_originals = {}  # (class, method name) -> undecorated function
+_enabled = weakref.WeakSet()  # Profilers currently recording
+
+
+class BehaviorProfiler:
+    """Opt-in per-behavior instrumentation for one model.
+
+    While enabled, the agent behavior methods are wrapped to record call
+    counts and inclusive wall time, and the model grid's get_neighbors records
+    the size of every neighbor list against the behavior that asked for it.
+    Nothing is wrapped while no profiler is enabled, so a model without one
+    runs the original methods. Call end_step() after each model step to close
+    that step's summary row.
+
+    The registry only holds profilers weakly: a profiler that is garbage
+    collected along with its model counts as disabled, and the wrappers are
+    removed once the last enabled one is gone.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.stack = []
+        self.current = {}
+        self.rows = []
+        self._finalizer = None
+
+    def enable(self):
+        if self in _enabled:
+            return
+        if not _originals:
+            _install()
+        _enabled.add(self)
+        self._finalizer = weakref.finalize(self, _release)
+        self.model.profiler = self
+        grid = self.model.grid
+        get_neighbors = grid.get_neighbors
+
+        @functools.wraps(get_neighbors)
+        def recording_get_neighbors(*args, **kwargs):
+            neighbors = get_neighbors(*args, **kwargs)
+            if self.stack:
+                stats = self.stats(self.stack[-1])
+                stats["neighbor_lists"] += 1
+                stats["neighbors"] += len(neighbors)
+            return neighbors
+
+        grid.get_neighbors = recording_get_neighbors
+
+    def disable(self):
+        if self not in _enabled:
+            return
+        _enabled.discard(self)
+        self._finalizer.detach()
+        _release()
+        self.model.profiler = None
+        # Drop the instance attribute so the class method is used again
+        self.model.grid.__dict__.pop("get_neighbors", None)
+
+    def stats(self, behavior):
+        stats = self.current.get(behavior)
+        if stats is None:
+            stats = self.current[behavior] = {"calls": 0, "seconds": 0.0, "neighbor_lists": 0, "neighbors": 0}
+        return stats
+
+    def end_step(self, step):
+        """Close the summary for the step that just ran"""
+        for behavior, stats in self.current.items():
+            self.rows.append(dict(stats, step=step, scenario=self.model.scenario, behavior=behavior))
+        self.current = {}
+
+    def get_step_dataframe(self):
+        """One row per (step, behavior) with calls, seconds and neighbor sizes"""
+        columns = ["step", "scenario", "behavior", "calls", "seconds", "neighbor_lists", "neighbors"]
+        return pd.DataFrame(self.rows, columns=columns)
+
+    def summary(self):
+        """Totals per scenario and behavior over all recorded steps"""
+        data = self.get_step_dataframe()
+        totals = data.groupby(["scenario", "behavior"])[["calls", "seconds", "neighbor_lists", "neighbors"]].sum()
+        totals["mean_neighbors"] = totals["neighbors"] / totals["neighbor_lists"].where(totals["neighbor_lists"] > 0)
+        return totals.sort_values("seconds", ascending=False)
+
+
+def _profiled(name, method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.model.profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        profiler.stack.append(name)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            stats = profiler.stats(name)
+            stats["calls"] += 1
+            stats["seconds"] += time.perf_counter() - start
+            profiler.stack.pop()
+    return wrapper
+
+
+def _release():
+    # Called after a profiler is disabled or collected. A collected profiler's
+    # dead entry can still be counted by len(), but iteration skips it
+    if not any(True for _ in _enabled):
+        _uninstall()
+
+
+def _install():
+    for cls in set(AGENT_CLASSES.values()):
+        for name in BEHAVIORS:
+            # Only wrap methods the class defines itself; inherited ones are
+            # wrapped on the base class
+            if name in vars(cls):
+                _originals[cls, name] = vars(cls)[name]
+                setattr(cls, name, _profiled(name, vars(cls)[name]))
+
+
+def _uninstall():
+    for (cls, name), method in _originals.items():
+        setattr(cls, name, method)
+    _originals.clear()
@@ -0,0 +1,136 @@
+# recorder.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class SeriesRecorder:
+    """Streaming replacement for DataCollector's model reporters.
+
+    Each collect() evaluates the reporters into a fixed-size ring buffer of
+    NumPy columns. When a path is given, rows are flushed to it in columnar
+    .npz chunks (one array per reporter), so memory stays bounded however
+    long the run is; without a path only the last `buffer_size` rows are kept.
+    """
+
+    def __init__(self, model_reporters, path=None, chunk_size=1024, buffer_size=4096):
+        if chunk_size > buffer_size:
+            raise ValueError("chunk_size must not exceed buffer_size")
+        self.model_reporters = dict(model_reporters)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer_size = buffer_size
+        self.columns = None  # Allocated on the first collect, once dtypes are known
+        self.rows = 0
+        self.flushed_rows = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def collect(self, model):
+        """Record one row of reporter values"""
+        values = {name: reporter(model) for name, reporter in self.model_reporters.items()}
+        if self.columns is None:
+            self.columns = {
+                name: np.zeros(self.buffer_size, dtype=np.int64 if isinstance(value, (bool, int, np.integer)) else float)
+                for name, value in values.items()
+            }
+        slot = self.rows % self.buffer_size
+        for name, value in values.items():
+            self.columns[name][slot] = value
+        self.rows += 1
+
+        if self.path is not None and self.rows - self.flushed_rows >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write every row not yet on disk as one chunk"""
+        if self.path is None or self.rows == self.flushed_rows:
+            return
+        chunk = self._buffered(self.flushed_rows, self.rows)
+        np.savez(os.path.join(self.path, f"chunk_{self.flushed_rows:09d}.npz"), **chunk)
+        self.flushed_rows = self.rows
+
+    def close(self):
+        """Flush the final partial chunk; call once the run has ended.
+
+        Collecting more rows afterwards is still allowed; they are written by
+        the next flush.
+        """
+        self.flush()
+
+    def restore(self, data):
+        """Continue from previously recorded rows, given as {column: array}.
+
+        With a path, the directory is rewritten to hold exactly these rows, so
+        chunks written past them by an earlier continuation are dropped.
+        """
+        rows = len(next(iter(data.values()), ()))
+        if self.path is not None:
+            for name in os.listdir(self.path):
+                if name.startswith("chunk_") and name.endswith(".npz"):
+                    os.remove(os.path.join(self.path, name))
+            for start in range(0, rows, self.chunk_size):
+                chunk = {name: np.asarray(values[start:start + self.chunk_size]) for name, values in data.items()}
+                np.savez(os.path.join(self.path, f"chunk_{start:09d}.npz"), **chunk)
+        if rows:
+            self.columns = {name: np.zeros(self.buffer_size, dtype=np.asarray(data[name]).dtype) for name in data}
+            held = max(0, rows - self.buffer_size)
+            slots = np.arange(held, rows) % self.buffer_size
+            for name, values in data.items():
+                self.columns[name][slots] = np.asarray(values)[held:]
+        self.rows = self.flushed_rows = rows
+
+    def _buffered(self, start, stop):
+        """Rows [start, stop) from the ring buffer; they must still be held"""
+        slots = np.arange(start, stop) % self.buffer_size
+        return {name: column[slots] for name, column in self.columns.items()}
+
+    def _stored(self, start, stop):
+        """Rows [start, stop) read back from the flushed chunks"""
+        pieces = []
+        for name in sorted(os.listdir(self.path)):
+            if not (name.startswith("chunk_") and name.endswith(".npz")):
+                continue
+            chunk_start = int(name[len("chunk_"):-len(".npz")])
+            if chunk_start >= stop:
+                break
+            with np.load(os.path.join(self.path, name)) as chunk:
+                chunk_stop = chunk_start + len(chunk[chunk.files[0]])
+                if chunk_stop <= start:
+                    continue
+                low, high = max(start, chunk_start) - chunk_start, min(stop, chunk_stop) - chunk_start
+                pieces.append({column: chunk[column][low:high] for column in chunk.files})
+        return {name: np.concatenate([piece[name] for piece in pieces]) for name in self.columns}
+
+    def rows_since(self, step):
+        """Reporter columns for every row collected at or after `step`"""
+        if self.columns is None or step >= self.rows:
+            return {name: np.zeros(0) for name in self.model_reporters}
+        oldest = max(0, self.rows - self.buffer_size)
+        if step >= oldest:
+            return self._buffered(step, self.rows)
+        if self.path is None:
+            raise ValueError(f"Rows before step {oldest} were dropped from the ring buffer")
+        stored = self._stored(step, oldest)
+        buffered = self._buffered(oldest, self.rows)
+        return {name: np.concatenate([stored[name], buffered[name]]) for name in self.columns}
+
+    def get_model_vars_dataframe(self):
+        """All rows still available, as DataCollector would return them"""
+        start = 0 if self.path is not None else max(0, self.rows - self.buffer_size)
+        data = pd.DataFrame(self.rows_since(start))
+        data.index = pd.RangeIndex(start, start + len(data))
+        return data
+
+
+def rows_since(collector, step):
+    """Reporter columns collected at or after `step` from either recorder.
+
+    Mesa's DataCollector keeps its model vars as lists, so slicing from
+    `step` only touches the new rows.
+    """
+    if isinstance(collector, SeriesRecorder):
+        return collector.rows_since(step)
+    return {name: np.asarray(values[step:]) for name, values in collector.model_vars.items()}
@@ -0,0 +1,52 @@
+# reinforcement.py
+
+import numpy as np
+
+from vectorized import neighborhood_sum, wrapped_offsets
+
+
+class BatchedReinforcement:
+    """Accumulate-then-apply echo-chamber reinforcement.
+
+    A reinforcing agent's pull on its similar neighbors only depends on its
+    cell and belief, so during the tick each one just adds 1 to a per-belief
+    count grid. At the end of the tick the counts are summed over every
+    cell's neighborhood, and each echo-chamber agent takes all the pull from
+    reinforcers that share its belief at once, clamped once. The outcome no
+    longer depends on activation order.
+    """
+
+    def __init__(self, model, radius, strength_gain, critical_thinking_loss):
+        grid = model.grid
+        self.model = model
+        self.strength_gain = strength_gain
+        self.critical_thinking_loss = critical_thinking_loss
+        self.offsets = wrapped_offsets(grid.width, grid.height, radius)
+        # reinforcers[0] counts informed reinforcers per cell, [1] misinformed ones
+        self.reinforcers = np.zeros((2, grid.width, grid.height), dtype=np.int64)
+        self.pending = False
+
+    def add(self, agent):
+        """Record that `agent` reinforces its similar neighbors this tick"""
+        self.reinforcers[int(agent.believes_misinformation)][agent.pos] += 1
+        self.pending = True
+
+    def apply(self):
+        """Apply this tick's accumulated reinforcement and reset the counts"""
+        if not self.pending:
+            return
+        grid = self.model.grid
+        for believes, counts in enumerate(self.reinforcers):
+            if not counts.any():
+                continue
+            pull = neighborhood_sum(counts, self.offsets)
+            xs, ys = np.nonzero(pull)
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                hits = int(pull[x, y])
+                for agent in grid.iter_cell_list_contents([(x, y)]):
+                    if agent.agent_type != "echo_chamber" or agent.believes_misinformation != believes:
+                        continue
+                    agent.belief_strength = min(1.0, agent.belief_strength + hits * self.strength_gain)
+                    agent.critical_thinking = max(0.1, agent.critical_thinking - hits * self.critical_thinking_loss)
+        self.reinforcers[:] = 0
+        self.pending = False
@@ -0,0 +1,135 @@
+# result_cache.py
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from misinformation_model import run_model
+
+# Modules whose source decides what a seeded run produces
+SOURCE_MODULES = [
+    "agent.py", "misinformation_model.py", "belief_grid.py", "convergence.py", "counter_rng.py", "density.py",
+    "distributed.py", "network.py", "population.py", "reinforcement.py", "scheduler.py", "selection.py",
+    "tallies.py", "vectorized.py",
+]
+
+
+def source_fingerprint(modules=SOURCE_MODULES):
+    """Hash of the simulation source, so cached runs expire when the model changes"""
+    digest = hashlib.sha256()
+    root = os.path.dirname(os.path.abspath(__file__))
+    for name in modules:
+        digest.update(name.encode())
+        with open(os.path.join(root, name), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of reporter series, keyed by run configuration.
+
+    The key hashes the model parameters, the seed and the source fingerprint
+    but not the step count: a stored run answers any request for as many or
+    fewer steps, and also any longer request when the stored run had already
+    stopped. Entries are .npz files; hits refresh their modification time and
+    the least recently used entries are deleted once the directory grows
+    past `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30, fingerprint=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint or source_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, params, seed):
+        config = json.dumps({"params": params, "seed": seed, "source": self.fingerprint}, sort_keys=True)
+        return hashlib.sha256(config.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _load(self, key):
+        try:
+            with np.load(self._path(key)) as stored:
+                arrays = dict(stored.items())
+        except (OSError, ValueError):
+            return None, None
+        meta = json.loads(arrays.pop("meta").tobytes().decode())
+        return meta, arrays
+
+    def get(self, params, seed, steps):
+        """The first `steps` rows of a cached run, or None on a miss"""
+        key = self.key(params, seed)
+        meta, arrays = self._load(key)
+        if meta is None or (meta["rows"] < steps and meta["running"]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(self._path(key))
+        data = pd.DataFrame({column: arrays["data_" + column][:steps] for column in meta["columns"]})
+        # A prefix that ends before the stored run stopped did not stop
+        stopped = meta["stop_step"] is not None and steps >= meta["stop_step"]
+        data.attrs.update(
+            stop_reason=meta["stop_reason"] if stopped else None,
+            stop_step=meta["stop_step"] if stopped else None,
+        )
+        return data
+
+    def put(self, params, seed, model):
+        """Store a model's reporter series, unless a longer run is already cached"""
+        key = self.key(params, seed)
+        data = model.datacollector.get_model_vars_dataframe()
+        meta, _ = self._load(key)
+        if meta is not None and (meta["rows"] >= len(data) or not meta["running"]):
+            return
+        meta = {
+            "params": params,
+            "seed": seed,
+            "rows": len(data),
+            "running": model.running,
+            "stop_reason": model.stop_reason,
+            "stop_step": model.stop_step,
+            "columns": list(data.columns),
+        }
+        arrays = {"data_" + column: data[column].to_numpy() for column in data.columns}
+        arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+        # Write to a temporary name first so readers never see a partial entry
+        temporary = self._path(key) + ".tmp"
+        with open(temporary, "wb") as output:
+            np.savez(output, **arrays)
+        os.replace(temporary, self._path(key))
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in
+        max_bytes, never deleting the entry for key `keep`"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz") and name != f"{keep}.npz":
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        if keep is not None and os.path.exists(self._path(keep)):
+            total += os.path.getsize(self._path(keep))
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    def run(self, params, seed, steps):
+        """Reporter series of a run of up to `steps` steps, from the cache if possible"""
+        data = self.get(params, seed, steps)
+        if data is not None:
+            return data
+        model = run_model(params, seed, steps)
+        self.put(params, seed, model)
+        data = model.datacollector.get_model_vars_dataframe()
+        data.attrs.update(stop_reason=model.stop_reason, stop_step=model.stop_step)
+        return data
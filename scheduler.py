@@ -0,0 +1,69 @@
+# scheduler.py
+
+from mesa.time import BaseScheduler
+
+# Agent types in the order their stages run
+DEFAULT_STAGE_ORDER = ["fact_checker", "influencer", "echo_chamber", "political", "normal"]
+
+
+class TypeStagedActivation(BaseScheduler):
+    """Scheduler that activates agents one type at a time.
+
+    Agents are kept in per-type groups. Each step runs the groups as stages in
+    `stage_order`, shuffling only within a group. A stage can be replaced by a
+    handler that processes the whole group at once (see set_stage_handler).
+
+    With simultaneous=True, belief changes made during a step are written to
+    a buffer and applied together at the end of the step, so every agent
+    reads the beliefs from the start of the step whatever order it runs in.
+    If several agents set the same agent's belief, the last write wins.
+    """
+
+    def __init__(self, model, stage_order=None, simultaneous=False, shuffle=True):
+        super().__init__(model)
+        self.stage_order = list(stage_order or DEFAULT_STAGE_ORDER)
+        self.simultaneous = simultaneous
+        self.shuffle = shuffle
+        self.groups = {}
+        self.stage_handlers = {}
+
+    def add(self, agent):
+        super().add(agent)
+        self.groups.setdefault(agent.agent_type, {})[agent.unique_id] = agent
+        if agent.agent_type not in self.stage_order:
+            self.stage_order.append(agent.agent_type)
+
+    def remove(self, agent):
+        super().remove(agent)
+        del self.groups[agent.agent_type][agent.unique_id]
+
+    def set_stage_handler(self, agent_type, handler):
+        """Run `handler(agents)` for a type's stage instead of stepping each agent"""
+        self.stage_handlers[agent_type] = handler
+
+    def step(self):
+        if self.simultaneous:
+            self.model.belief_buffer = {}
+        for agent_type in self.stage_order:
+            self.step_type(agent_type)
+        if self.simultaneous:
+            pending, self.model.belief_buffer = self.model.belief_buffer, None
+            for agent, value in pending.items():
+                agent.believes_misinformation = value
+        self.steps += 1
+        self.time += 1
+
+    def step_type(self, agent_type):
+        """Run one stage over all agents of the given type"""
+        group = self.groups.get(agent_type)
+        if not group:
+            return
+        agents = list(group.values())
+        if self.shuffle:
+            self.model.random.shuffle(agents)
+        handler = self.stage_handlers.get(agent_type)
+        if handler is not None:
+            handler(agents)
+            return
+        for agent in agents:
+            agent.step()
@@ -0,0 +1,17 @@
+# selection.py
+
+import heapq
+
+
+def by_priority(candidates, key, highest_first=False):
+    """Yield candidates in order of key, lazily.
+
+    Heapifying is O(n) and each candidate taken costs O(log n), so a caller
+    that stops after the first few pays much less than for a full sort. Ties
+    come out in their original order, exactly as sorted() would give them.
+    """
+    sign = -1 if highest_first else 1
+    heap = [(sign * key(candidate), index, candidate) for index, candidate in enumerate(candidates)]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
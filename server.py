@@ -1,7 +1,6 @@
-from mesa.visualization.modules import CanvasGrid
-from mesa.visualization.ModularVisualization import ModularServer
 from mesa.visualization.modules import ChartModule
 from mesa.visualization.UserParam import UserSettableParameter
+from delta_canvas import DeltaCanvasGrid, DeltaModularServer
 from misinformation_model import MisinformationModel
 
 def agent_portrayal(agent):
@@ -56,8 +55,9 @@ def agent_portrayal(agent):
         portrayal["text"] = "M" if agent.believes_misinformation else "I"
     return portrayal
 
-# Create grid visualization with larger size
-grid = CanvasGrid(agent_portrayal, 10, 10, 600, 600)
+# Create grid visualization with larger size; only changes are sent to the
+# browser, and large populations are drawn as a per-cell heat map
+grid = DeltaCanvasGrid(agent_portrayal, 10, 10, 600, 600, aggregate_above=2000)
 
 # Create charts for tracking different metrics
 belief_chart = ChartModule(
@@ -91,7 +91,7 @@ influence_chart = ChartModule(
 model_params = {
     "width": 10,
     "height": 10,
-    "num_agents": UserSettableParameter("slider", "Number of Agents", 100, 10, 200, 10),
+    "num_agents": UserSettableParameter("slider", "Number of Agents", 100, 10, 10000, 10),
     "num_influencers": UserSettableParameter("slider", "Number of Influencers", 10, 1, 50, 1),
     "scenario": UserSettableParameter(
         "choice",
@@ -102,7 +102,7 @@ model_params = {
 }
 
 # Create and launch server
-server = ModularServer(
+server = DeltaModularServer(
     MisinformationModel,
     [grid, belief_chart, agent_type_chart, influence_chart],
     "Social Media Misinformation Model",
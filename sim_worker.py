@@ -0,0 +1,77 @@
+# sim_worker.py
+
+import queue
+import threading
+import time
+
+from recorder import rows_since
+
+
+class SimulationWorker(threading.Thread):
+    """Steps a model in a background thread and publishes snapshots.
+
+    Every `publish_interval` seconds the worker puts a snapshot on the bounded
+    `snapshots` queue: the reporter rows collected since the last snapshot
+    that was accepted, the step count and the recent steps per second. When
+    the queue is full the rows stay pending and go out with the next snapshot,
+    so a slow consumer sees fewer, larger snapshots but never loses rows.
+    Only this thread touches the model while it runs.
+    """
+
+    def __init__(self, model, queue_size=4, publish_interval=0.05, max_steps=None):
+        super().__init__(daemon=True)
+        self.model = model
+        self.snapshots = queue.Queue(maxsize=queue_size)
+        self.publish_interval = publish_interval
+        self.max_steps = max_steps
+        self._stop_event = threading.Event()
+        self._published_rows = 0
+        self._window_start = time.perf_counter()
+        self._window_steps = 0
+        self.steps_per_second = 0.0
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        model = self.model
+        steps = 0
+        last_publish = time.perf_counter()
+        while not self._stop_event.is_set() and model.running:
+            if self.max_steps is not None and steps >= self.max_steps:
+                break
+            model.step()
+            steps += 1
+            self._window_steps += 1
+            now = time.perf_counter()
+            if now - last_publish >= self.publish_interval:
+                self.publish(now)
+                last_publish = now
+        model.flush()
+        # The last snapshot must get through, unless the consumer went away
+        while not self.publish(time.perf_counter(), done=True):
+            if self._stop_event.wait(self.publish_interval):
+                break
+
+    def publish(self, now, done=False):
+        """Try to queue a snapshot; returns False if the queue was full"""
+        elapsed = now - self._window_start
+        if elapsed > 0 and self._window_steps:
+            self.steps_per_second = self._window_steps / elapsed
+        self._window_start = now
+        self._window_steps = 0
+
+        rows = rows_since(self.model.datacollector, self._published_rows)
+        snapshot = {
+            "step": self.model.step_count,
+            "rows": rows,
+            "steps_per_second": self.steps_per_second,
+            "running": self.model.running,
+            "done": done,
+        }
+        try:
+            self.snapshots.put_nowait(snapshot)
+        except queue.Full:
+            return False
+        self._published_rows += len(next(iter(rows.values()), ()))
+        return True
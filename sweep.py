@@ -0,0 +1,131 @@
+# sweep.py
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from misinformation_model import run_model
+
+MANIFEST = "manifest.jsonl"
+
+
+def run_seed(base_seed, params, replicate):
+    """Derive a stable seed from the sweep seed, run parameters and replicate"""
+    key = json.dumps([base_seed, params, replicate], sort_keys=True)
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big")
+
+
+def build_runs(scenarios, num_agents, num_influencers, grid_sizes, replicates, base_seed=0, engine="agent"):
+    """Expand the parameter grid into one run description per replicate"""
+    runs = []
+    for scenario, agents, influencers, (width, height) in itertools.product(
+        scenarios, num_agents, num_influencers, grid_sizes
+    ):
+        params = {
+            "width": width,
+            "height": height,
+            "num_agents": agents,
+            "num_influencers": influencers,
+            "scenario": scenario,
+            "engine": engine,
+        }
+        for replicate in range(replicates):
+            seed = run_seed(base_seed, params, replicate)
+            runs.append({"run_id": f"{seed:016x}", "replicate": replicate, "seed": seed, "params": params})
+    return runs
+
+
+def execute_run(run, steps, out_dir, profile=False):
+    """Run one model and write its reporter table next to the manifest"""
+    model = run_model(run["params"], run["seed"], steps, profile=profile)
+
+    path = os.path.join(out_dir, "runs", run["run_id"] + ".csv")
+    # Write to a temporary name first so an interrupted run never looks finished
+    model.datacollector.get_model_vars_dataframe().to_csv(path + ".tmp", index_label="Step")
+    if model.profiler is not None:
+        model.profiler.get_step_dataframe().to_csv(path[:-len(".csv")] + ".profile.csv", index=False)
+    os.replace(path + ".tmp", path)
+    return dict(
+        run, steps=model.step_count, stop_reason=model.stop_reason, stop_step=model.stop_step,
+        file=os.path.relpath(path, out_dir),
+    )
+
+
+def completed_runs(out_dir):
+    """Ids of runs already recorded in the sweep manifest"""
+    done = set()
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return done
+    with open(path) as manifest:
+        for line in manifest:
+            try:
+                done.add(json.loads(line)["run_id"])
+            except (ValueError, KeyError):
+                # A sweep killed mid-write can leave a truncated last line
+                continue
+    return done
+
+
+def run_sweep(runs, steps, out_dir, workers=None, profile=False):
+    """Execute the runs in parallel, skipping any that a previous sweep finished.
+
+    Each finished run is appended to the manifest as soon as it completes, so
+    an interrupted sweep resumes from where it stopped. Returns the number of
+    runs executed. With profile=True each run also writes its per-step
+    behavior profile next to its reporter table.
+    """
+    os.makedirs(os.path.join(out_dir, "runs"), exist_ok=True)
+    done = completed_runs(out_dir)
+    pending = [run for run in runs if run["run_id"] not in done]
+
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path, "ab+") as manifest:
+        # Start a fresh line after a record truncated by an interrupted sweep
+        if manifest.tell() > 0:
+            manifest.seek(-1, os.SEEK_END)
+            if manifest.read(1) != b"\n":
+                manifest.write(b"\n")
+
+    with open(path, "a") as manifest, ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(execute_run, run, steps, out_dir, profile) for run in pending]
+        for future in as_completed(futures):
+            manifest.write(json.dumps(future.result()) + "\n")
+            manifest.flush()
+    return len(pending)
+
+
+def parse_grid_size(value):
+    width, _, height = value.partition("x")
+    return int(width), int(height or width)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a MisinformationModel parameter sweep")
+    parser.add_argument("--scenarios", nargs="+", default=["natural"])
+    parser.add_argument("--num-agents", nargs="+", type=int, default=[100])
+    parser.add_argument("--num-influencers", nargs="+", type=int, default=[10])
+    parser.add_argument("--grid-sizes", nargs="+", type=parse_grid_size, default=[(10, 10)],
+                        help="Grid sizes as WIDTHxHEIGHT")
+    parser.add_argument("--replicates", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for the whole sweep")
+    parser.add_argument("--engine", default="agent", choices=["agent", "vectorized", "tiled"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="sweep_output")
+    parser.add_argument("--profile", action="store_true", help="Record per-behavior timings for each run")
+    args = parser.parse_args()
+
+    runs = build_runs(
+        args.scenarios, args.num_agents, args.num_influencers, args.grid_sizes,
+        args.replicates, base_seed=args.seed, engine=args.engine,
+    )
+    executed = run_sweep(runs, args.steps, args.out, workers=args.workers, profile=args.profile)
+    print(f"Ran {executed} of {len(runs)} runs; results in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# tallies.py
+
+from collections import Counter
+
+
+class AgentTallies:
+    """Running aggregates over the scheduled agents.
+
+    Agents are counted when the model adds them; from then on UserAgent's
+    property setters report every change, so the DataCollector reporters read
+    these totals instead of scanning the whole schedule.
+    """
+
+    def __init__(self):
+        self.agents = 0
+        self.misinformed = 0
+        self.types = Counter()
+        self.political_sides = Counter()
+        self.total_influence = 0.0
+        self.critical_thinking = 0.0
+
+    @property
+    def informed(self):
+        return self.agents - self.misinformed
+
+    def add(self, agent):
+        """Start tracking an agent"""
+        self.agents += 1
+        self.misinformed += int(agent.believes_misinformation)
+        self.types[agent.agent_type] += 1
+        if agent.agent_type == "political":
+            self.political_sides[agent.political_side] += 1
+        if agent.agent_type == "influencer":
+            self.total_influence += agent.influence_count
+        self.critical_thinking += agent.critical_thinking
+        agent._tallied = True
+
+    def add_all(self, agents):
+        """Start tracking many agents, one pass per aggregate; the float sums
+        are added up in the same order add() would"""
+        self.agents += len(agents)
+        self.misinformed += sum(agent.believes_misinformation for agent in agents)
+        self.types.update(agent.agent_type for agent in agents)
+        self.political_sides.update(agent.political_side for agent in agents if agent.agent_type == "political")
+        for agent in agents:
+            if agent.agent_type == "influencer":
+                self.total_influence += agent.influence_count
+            self.critical_thinking += agent.critical_thinking
+            agent._tallied = True
+
+    def belief_changed(self, believes_misinformation):
+        self.misinformed += 1 if believes_misinformation else -1
+
+    def political_side_changed(self, old, new):
+        self.political_sides[old] -= 1
+        self.political_sides[new] += 1
@@ -0,0 +1,131 @@
+# tests/test_belief_grid.py
+
+import random
+
+import numpy as np
+import pytest
+from mesa.space import MultiGrid
+
+from belief_grid import BeliefGrid
+from misinformation_model import MisinformationModel
+
+
+class Dot:
+    def __init__(self, believes_misinformation):
+        self.pos = None
+        self.believes_misinformation = believes_misinformation
+
+
+def twin_grids(width, height, torus, count, rng):
+    """A BeliefGrid and a MultiGrid holding the same agents in the same cells"""
+    grid = BeliefGrid(width, height, torus)
+    reference = MultiGrid(width, height, torus)
+    agents = [Dot(rng.random() < 0.4) for _ in range(count)]
+    for agent in agents:
+        pos = (rng.randrange(width), rng.randrange(height))
+        grid.place_agent(agent, pos)
+        reference._grid[pos[0]][pos[1]].append(agent)
+    return grid, reference, agents
+
+
+def brute_force_counts(reference, pos, radius, include_center):
+    neighbors = reference.get_neighbors(pos, moore=True, include_center=include_center, radius=radius)
+    return sum(a.believes_misinformation for a in neighbors), len(neighbors)
+
+
+@pytest.mark.parametrize("width, height, torus", [(10, 10, True), (7, 4, True), (9, 6, False), (3, 3, True)])
+@pytest.mark.parametrize("direct_radius", [BeliefGrid.direct_radius, 0])
+def test_radius_counts_match_neighbor_lists(width, height, torus, direct_radius):
+    rng = random.Random(width * height)
+    grid, reference, agents = twin_grids(width, height, torus, 60, rng)
+    # With a direct radius of 0, every query beyond the 3x3 shortcut uses the Fenwick trees
+    grid.direct_radius = direct_radius
+    for _ in range(200):
+        agent = rng.choice(agents)
+        operation = rng.random()
+        if operation < 0.4:
+            agent.believes_misinformation = not agent.believes_misinformation
+            grid.update_belief(agent)
+        else:
+            old = agent.pos
+            reference._grid[old[0]][old[1]].remove(agent)
+            grid.move_agent(agent, (rng.randrange(width), rng.randrange(height)))
+            reference._grid[agent.pos[0]][agent.pos[1]].append(agent)
+        pos = (rng.randrange(width), rng.randrange(height))
+        radius = rng.randint(1, 4)
+        include_center = rng.random() < 0.5
+        misinformed, total = brute_force_counts(reference, pos, radius, include_center)
+        assert grid.count_misinformed(pos, radius, include_center) == misinformed
+        assert grid.count_agents(pos, radius, include_center) == total
+        assert grid.count_informed(pos, radius, include_center) == total - misinformed
+
+
+def test_removed_agents_are_discounted():
+    grid = BeliefGrid(5, 5, True)
+    agents = [Dot(True), Dot(False), Dot(True)]
+    for agent in agents:
+        grid.place_agent(agent, (2, 2))
+    grid.remove_agent(agents[0])
+    assert grid.misinformed_at((2, 2)) == 1
+    assert grid.count_agents((2, 2), radius=1, include_center=True) == 2
+
+
+@pytest.mark.parametrize("width, height", [(10, 10), (7, 4), (6, 5), (3, 3), (2, 5)])
+@pytest.mark.parametrize("torus", [True, False])
+def test_neighborhoods_follow_multigrid_order(width, height, torus):
+    rng = random.Random(width + 31 * height)
+    grid, reference, _ = twin_grids(width, height, torus, 3 * width * height, rng)
+    for moore in (True, False):
+        for include_center in (True, False):
+            for radius in range(1, 5):
+                for pos in [(0, 0), (width - 1, height - 1), (width // 2, height // 2)]:
+                    args = (pos, moore, include_center, radius)
+                    assert grid.get_neighborhood(*args) == reference.get_neighborhood(*args)
+                    assert grid.get_neighbors(*args) == reference.get_neighbors(*args)
+                    assert list(grid.iter_neighbors(*args)) == reference.get_neighbors(*args)
+
+
+def test_neighborhood_caches_stay_bounded():
+    grid = BeliefGrid(20, 20, True)
+    grid.max_offset_tables = 4
+    grid.max_cached_cells = 300
+    for radius in range(1, 4):
+        for moore in (True, False):
+            for x in range(20):
+                for y in range(20):
+                    grid.get_neighborhood((x, y), moore, radius=radius)
+    info = grid.cache_info()
+    assert info["tables"] <= 4
+    assert info["cells"] <= 300
+    assert info["cells"] == sum(len(cells) for _, cells in grid._neighborhoods.values())
+    # Evicted entries are recomputed identically
+    reference = MultiGrid(20, 20, True)
+    assert grid.get_neighborhood((0, 0), True, radius=1) == reference.get_neighborhood((0, 0), True, radius=1)
+
+
+def test_changing_a_returned_neighborhood_leaves_the_cache_intact():
+    grid = BeliefGrid(10, 10, True)
+    reference = MultiGrid(10, 10, True)
+    cells = grid.get_neighborhood((5, 5), True)
+    cells.pop()
+    cells.append((0, 0))
+    grid.get_neighborhood((5, 5), True).clear()
+    assert grid.get_neighborhood((5, 5), True) == reference.get_neighborhood((5, 5), True)
+    assert grid.cache_info()["hits"] == 2
+
+@pytest.mark.parametrize("scenario, engine", [
+    ("natural", "agent"), ("natural", "vectorized"), ("fact_checkers", "agent"),
+    ("influencers", "agent"), ("echo_chamber", "agent"), ("political", "agent"),
+])
+def test_model_grid_counts_follow_agents(scenario, engine):
+    model = MisinformationModel(scenario=scenario, engine=engine, seed=9)
+    grid = model.grid
+    for _ in range(15):
+        model.step()
+        misinformed = np.zeros((grid.width, grid.height), dtype=int)
+        agents = np.zeros((grid.width, grid.height), dtype=int)
+        for agent in model.schedule.agents:
+            misinformed[agent.pos] += agent.believes_misinformation
+            agents[agent.pos] += 1
+        assert np.array_equal(grid.misinformed_counts, misinformed)
+        assert np.array_equal(grid.agent_counts, agents)
@@ -0,0 +1,105 @@
+# tests/test_checkpoint.py
+
+import numpy as np
+import pytest
+
+from checkpoint import fork_checkpoint, load_checkpoint, save_checkpoint
+from event_log import EventLog
+from misinformation_model import MisinformationModel
+
+
+def state(model):
+    return sorted(
+        (a.unique_id, a.pos, a.believes_misinformation, a.critical_thinking) for a in model.schedule.agents
+    )
+
+
+def stored_rows(path):
+    chunks = []
+    for chunk in sorted(path.glob("chunk_*.npz")):
+        with np.load(chunk) as stored:
+            chunks.append(stored["Misinformed"])
+    return np.concatenate(chunks)
+
+
+@pytest.mark.parametrize("scenario, options", [
+    ("natural", {}),
+    ("natural", {"engine": "vectorized"}),
+    ("fact_checkers", {}),
+    ("influencers", {"activation": "staged"}),
+    ("echo_chamber", {"reinforcement": "batched"}),
+    ("political", {"activation": "simultaneous"}),
+    ("influencers", {"rng": "counter"}),
+])
+def test_restored_model_continues_identically(tmp_path, scenario, options):
+    original = MisinformationModel(20, 20, 200, 10, scenario, seed=4, stopping=None, **options)
+    for _ in range(5):
+        original.step()
+    save_checkpoint(original, tmp_path / "model.npz")
+    restored = load_checkpoint(tmp_path / "model.npz")
+    for _ in range(10):
+        original.step()
+        restored.step()
+    assert state(restored) == state(original)
+    assert restored.datacollector.get_model_vars_dataframe().equals(
+        original.datacollector.get_model_vars_dataframe()
+    )
+
+
+def test_restored_model_keeps_streaming_to_its_recorder(tmp_path):
+    uninterrupted = MisinformationModel(seed=2, stopping=None)
+    model = MisinformationModel(seed=2, record_to=str(tmp_path / "rows"), stopping=None)
+    for _ in range(5):
+        model.step()
+        uninterrupted.step()
+    save_checkpoint(model, tmp_path / "model.npz")
+    for _ in range(3):
+        model.step()  # This continuation is abandoned
+    restored = load_checkpoint(tmp_path / "model.npz")
+    for _ in range(10):
+        restored.step()
+        uninterrupted.step()
+    restored.flush()
+    expected = uninterrupted.datacollector.get_model_vars_dataframe()["Misinformed"].to_numpy()
+    assert np.array_equal(stored_rows(tmp_path / "rows"), expected)
+
+
+def test_restored_model_keeps_logging_events(tmp_path):
+    def logged_model(path):
+        return MisinformationModel(20, 20, 200, 10, "fact_checkers", seed=2, event_log=EventLog(str(path)), stopping=None)
+
+    uninterrupted = logged_model(tmp_path / "expected.jsonl")
+    model = logged_model(tmp_path / "events.jsonl")
+    for _ in range(5):
+        model.step()
+    save_checkpoint(model, tmp_path / "model.npz")
+    model.step()  # This continuation is abandoned
+    model.flush()
+    restored = load_checkpoint(tmp_path / "model.npz")
+    for _ in range(5):
+        restored.step()
+    restored.flush()
+    for _ in range(10):
+        uninterrupted.step()
+    uninterrupted.flush()
+    assert (tmp_path / "events.jsonl").read_text() == (tmp_path / "expected.jsonl").read_text()
+
+
+def test_profiling_survives_a_restore(tmp_path):
+    model = MisinformationModel(seed=1, profile=True, stopping=None)
+    for _ in range(3):
+        model.step()
+    save_checkpoint(model, tmp_path / "model.npz")
+    restored = load_checkpoint(tmp_path / "model.npz")
+    assert restored.profiler is not None
+    restored.step()
+    assert restored.profiler.get_step_dataframe()["step"].max() == 4
+    assert len(restored.profiler.rows) > len(model.profiler.rows)
+
+
+def test_forks_record_in_memory(tmp_path):
+    model = MisinformationModel(seed=2, record_to=str(tmp_path / "rows"), stopping=None)
+    model.step()
+    save_checkpoint(model, tmp_path / "model.npz")
+    for fork in fork_checkpoint(tmp_path / "model.npz", 2):
+        assert not hasattr(fork.datacollector, "path")
@@ -0,0 +1,59 @@
+# tests/test_convergence.py
+
+import numpy as np
+
+from convergence import AbsorbingState, ConvergenceMonitor, Oscillation, SteadyState
+from misinformation_model import MisinformationModel
+
+PARAMS = {"width": 10, "height": 10, "num_agents": 40, "num_influencers": 10, "scenario": "natural"}
+
+
+class Tallies:
+    agents = 100
+
+
+class Model:
+    tallies = Tallies()
+
+
+def test_early_stopping_is_opt_in():
+    # Seed 18 reaches Misinformed=0 after a few steps
+    model = MisinformationModel(**PARAMS, seed=18)
+    for _ in range(50):
+        model.step()
+    assert model.running
+    assert len(model.datacollector.get_model_vars_dataframe()) == 50
+
+    stopping = MisinformationModel(**PARAMS, seed=18, stopping="default")
+    while stopping.running and stopping.step_count < 50:
+        stopping.step()
+    assert stopping.stop_reason == "absorbing:Misinformed=0"
+    assert stopping.step_count < 50
+
+
+def test_fact_checkers_still_end_without_misinformed_agents():
+    model = MisinformationModel(10, 10, 100, 10, "fact_checkers", seed=1)
+    while model.running and model.step_count < 200:
+        model.step()
+    assert not model.running
+    assert model.tallies.misinformed == 0
+    assert model.stop_reason == "no_misinformed_agents"
+
+
+def test_criteria():
+    model = Model()
+    flat = {"Misinformed": np.full(50, 30.0)}
+    assert SteadyState(["Misinformed"]).check(model, flat, {}) == "steady_state"
+    assert Oscillation("Misinformed").check(model, {"Misinformed": np.full(40, 30.0)}, {}) is None
+    alternating = {"Misinformed": np.tile([20.0, 40.0], 20)}
+    assert SteadyState(["Misinformed"], window=40).check(model, alternating, {}) is None
+    assert Oscillation("Misinformed").check(model, alternating, {}) == "oscillation:period=2"
+    assert AbsorbingState("Informed").check(model, {}, {"Informed": 0}) == "absorbing:Informed=0"
+
+
+def test_monitor_respects_min_steps():
+    model = MisinformationModel(**PARAMS, seed=18)
+    model.step()
+    always = AbsorbingState("Misinformed", model.tallies.misinformed, reason="reached")
+    assert ConvergenceMonitor([always], min_steps=2).check(model) is None
+    assert ConvergenceMonitor([always]).check(model) == "reached"
@@ -0,0 +1,102 @@
+# tests/test_delta_canvas.py
+
+import base64
+
+import numpy as np
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+
+from delta_canvas import DeltaCanvasGrid, DeltaModularServer, DeltaSocketHandler
+from misinformation_model import MisinformationModel
+
+
+def portrayal(agent):
+    return {"Shape": "circle", "Layer": 0, "Color": "red" if agent.believes_misinformation else "green"}
+
+
+def unpack(text, dtype=np.int32):
+    return np.frombuffer(base64.b64decode(text), dtype=np.dtype(dtype).newbyteorder("<"))
+
+
+class Client:
+    """Applies frames the way delta_canvas.js does"""
+
+    def __init__(self):
+        self.styles = {}
+        self.agents = {}
+
+    def apply(self, frame):
+        if frame["full"]:
+            self.styles = {}
+            self.agents = {}
+        self.styles.update(frame["styles"])
+        columns = [unpack(frame[key]) for key in ("ids", "x", "y", "style")]
+        for uid, x, y, style in zip(*columns):
+            self.agents[int(uid)] = (int(x), int(y), int(style))
+        for uid in unpack(frame["removed"]):
+            del self.agents[int(uid)]
+        for style in unpack(frame["dropped_styles"]):
+            del self.styles[int(style)]
+
+    def drawn(self, key="Color"):
+        """What each agent is drawn with, resolved through the style table"""
+        return {uid: (x, y, self.styles[style][key]) for uid, (x, y, style) in self.agents.items()}
+
+
+def truth(model):
+    return {a.unique_id: (a.pos[0], a.pos[1], portrayal(a)["Color"]) for a in model.schedule.agents}
+
+
+class Connection:
+    pass
+
+
+def test_each_connection_gets_deltas_against_its_own_frames():
+    model = MisinformationModel(10, 10, 100, 10, "influencers", seed=3)
+    canvas = DeltaCanvasGrid(portrayal, 10, 10, keyframe_interval=1000)
+    first, second = Connection(), Connection()
+    first_view, second_view = Client(), Client()
+    for step in range(12):
+        model.step()
+        first_view.apply(canvas.render(model, first))
+        assert first_view.drawn() == truth(model)
+        if step % 3 == 0:
+            # The second tab only refreshes now and then
+            second_view.apply(canvas.render(model, second))
+            assert second_view.drawn() == truth(model)
+
+    # A reconnect is a new connection and starts from a full frame
+    frame = canvas.render(model, Connection())
+    assert frame["full"]
+    assert len(unpack(frame["ids"])) == len(model.schedule.agents)
+
+
+def test_server_routes_websockets_to_the_per_connection_handler():
+    canvas = DeltaCanvasGrid(portrayal, 10, 10)
+    server = DeltaModularServer(MisinformationModel, [canvas], "test", {"width": 10, "height": 10})
+    request = HTTPServerRequest(method="GET", uri="/ws", headers=HTTPHeaders({"Host": "localhost"}))
+    delegate = server.find_handler(request)
+    assert delegate.handler_class is DeltaSocketHandler
+
+
+def sized_portrayal(agent):
+    # A continuous size, like the influencers' in server.py
+    return {"Shape": "circle", "Layer": 0, "r": 0.8 + agent.unique_id * 0.01 + agent.model.step_count * 0.001}
+
+
+def test_unused_styles_are_dropped_between_keyframes():
+    model = MisinformationModel(10, 10, 100, 10, "influencers", seed=3)
+    canvas = DeltaCanvasGrid(sized_portrayal, 10, 10, keyframe_interval=1000)
+    client, view = Connection(), Client()
+    for _ in range(30):
+        model.step()
+        view.apply(canvas.render(model, client))
+        assert view.drawn("r") == {a.unique_id: (*a.pos, sized_portrayal(a)["r"]) for a in model.schedule.agents}
+        # Without dropping, every frame would add a style per agent
+        assert len(view.styles) == len(canvas._clients[client].styles) <= 2 * 100 + 64
+
+
+def test_unhashable_portrayals_still_dedupe():
+    model = MisinformationModel(10, 10, 100, 10, "natural", seed=3)
+    canvas = DeltaCanvasGrid(lambda agent: {"Shape": "circle", "Layer": 0, "Color": ["red", "blue"]}, 10, 10)
+    frame = canvas.render(model)
+    assert len(frame["styles"]) == 1
@@ -0,0 +1,62 @@
+# tests/test_density.py
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from belief_grid import BeliefGrid
+from density import MisinformationDensity, box_blur
+
+
+class Dot:
+    def __init__(self, believes_misinformation):
+        self.pos = None
+        self.believes_misinformation = believes_misinformation
+
+
+def test_box_blur_matches_direct_sum():
+    field = np.random.default_rng(0).integers(0, 5, size=(9, 7)).astype(float)
+    radius = 2
+    expected = np.zeros_like(field)
+    for x in range(9):
+        for y in range(7):
+            for dx in range(-radius, radius + 1):
+                for dy in range(-radius, radius + 1):
+                    expected[x, y] += field[(x + dx) % 9, (y + dy) % 7]
+    assert np.allclose(box_blur(field, radius), expected)
+
+
+def test_uphill_leads_to_the_cluster():
+    grid = BeliefGrid(30, 30, torus=True)
+    for _ in range(10):
+        grid.place_agent(Dot(True), (20, 20))
+    model = SimpleNamespace(grid=grid, step_count=0)
+    density = MisinformationDensity(model)
+
+    pos = (15, 25)
+    for _ in range(20):
+        target = density.uphill(pos)
+        if target is None:
+            break
+        assert density.value(target) > density.value(pos)
+        pos = target
+    assert pos == (20, 20)
+    # Beyond the blur's reach the field is flat
+    assert density.value((5, 5)) == 0 and density.uphill((5, 5)) is None
+
+
+def test_field_refreshes_once_per_step():
+    grid = BeliefGrid(10, 10, torus=True)
+    agent = Dot(True)
+    grid.place_agent(agent, (2, 2))
+    model = SimpleNamespace(grid=grid, step_count=0)
+    density = MisinformationDensity(model)
+    before = density.value((2, 2))
+    field = density.field
+
+    agent.believes_misinformation = False
+    grid.update_belief(agent)
+    # Same tick: the cached field is reused
+    assert density.value((2, 2)) == before and density.field is field
+    model.step_count += 1
+    assert density.value((2, 2)) == 0
@@ -0,0 +1,86 @@
+# tests/test_distributed.py
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import misinformation_model
+from ensemble import run_replicate
+from misinformation_model import MisinformationModel
+from result_cache import ResultCache
+from sweep import execute_run
+
+ROOT = os.path.dirname(os.path.abspath(misinformation_model.__file__))
+PARAMS = {"width": 12, "height": 12, "num_agents": 150, "num_influencers": 10, "scenario": "natural"}
+
+
+def beliefs(model):
+    return sorted((a.unique_id, a.believes_misinformation) for a in model.schedule.agents)
+
+
+def test_tiled_matches_vectorized_in_counter_mode():
+    vectorized = MisinformationModel(**PARAMS, engine="vectorized", rng="counter", seed=5)
+    tiled = MisinformationModel(**PARAMS, engine="tiled", workers=2, rng="counter", seed=5)
+    try:
+        for _ in range(10):
+            vectorized.step()
+            tiled.step()
+            assert tiled.tallies.misinformed == vectorized.tallies.misinformed
+        assert beliefs(tiled) == beliefs(vectorized)
+        assert (tiled.grid.misinformed_counts == vectorized.grid.misinformed_counts).all()
+    finally:
+        tiled.close()
+
+
+def test_dead_worker_raises_instead_of_hanging():
+    model = MisinformationModel(**PARAMS, engine="tiled", workers=2, seed=5)
+    model.step()
+    model.engine.processes[0].kill()
+    model.engine.processes[0].join()
+    with pytest.raises(RuntimeError, match="exited"):
+        model.step()
+
+
+def test_workers_that_cannot_start_raise():
+    # Spawned workers cannot import a __main__ read from stdin
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {ROOT!r})
+        from misinformation_model import MisinformationModel
+        MisinformationModel(**{PARAMS!r}, engine="tiled", workers=2)
+    """)
+    result = subprocess.run(
+        [sys.executable, "-"], input=script, capture_output=True, text=True, timeout=60, cwd="/",
+    )
+    assert result.returncode != 0
+    assert "did not start" in result.stderr
+
+
+@pytest.mark.parametrize("runner", ["sweep", "ensemble", "result_cache"])
+def test_runners_release_workers_and_shared_memory(runner, tmp_path, monkeypatch):
+    engines = []
+    original = misinformation_model.TiledNaturalSpreadEngine.__init__
+
+    def record(engine, *args, **kwargs):
+        original(engine, *args, **kwargs)
+        engines.append(engine)
+
+    monkeypatch.setattr(misinformation_model.TiledNaturalSpreadEngine, "__init__", record)
+    params = dict(PARAMS, engine="tiled")
+    if runner == "sweep":
+        os.makedirs(tmp_path / "runs")
+        execute_run({"run_id": "tiled", "seed": 5, "params": params}, 3, str(tmp_path))
+    elif runner == "ensemble":
+        run_replicate(params, 5, 3)
+    else:
+        ResultCache(str(tmp_path)).run(params, 5, 3)
+
+    # Released as soon as the run returns, without waiting for garbage collection
+    (engine,) = engines
+    assert not engine._finalizer.alive
+    assert not any(process.is_alive() for process in engine.processes)
+    for block in engine._blocks:
+        assert not os.path.exists("/dev/shm/" + block.name.lstrip("/"))
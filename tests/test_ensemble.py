@@ -0,0 +1,35 @@
+# tests/test_ensemble.py
+
+import numpy as np
+
+from ensemble import EnsembleStats, run_replicate
+from misinformation_model import MisinformationModel
+
+PARAMS = {"width": 10, "height": 10, "num_agents": 40, "num_influencers": 10, "scenario": "natural"}
+
+
+def run_until_stopped(seed, steps):
+    model = MisinformationModel(**PARAMS, seed=seed, stopping="default")
+    while model.running and model.step_count < steps:
+        model.step()
+    return model
+
+
+def test_absorbed_run_pads_with_its_final_state():
+    # Seed 18 reaches Misinformed=0 within a few steps
+    model = run_until_stopped(18, 100)
+    assert model.stop_reason == "absorbing:Misinformed=0"
+    series = run_replicate(PARAMS, 18, 100)
+    assert len(series["Misinformed"]) == 100
+    assert np.all(series["Misinformed"][model.stop_step:] == 0)
+    assert np.all(series["Informed"][model.stop_step:] == 40)
+
+
+def test_welford_matches_batch_statistics():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(size=(7, 5))
+    stats = EnsembleStats(["x"], 5)
+    for sample in samples:
+        stats.add({"x": sample})
+    assert np.allclose(stats.mean["x"], samples.mean(axis=0))
+    assert np.allclose(stats.variance("x"), samples.var(axis=0, ddof=1))
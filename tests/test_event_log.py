@@ -0,0 +1,63 @@
+# tests/test_event_log.py
+
+import json
+
+from event_log import EventLog
+
+
+def read_events(path):
+    with open(path) as sink:
+        return [json.loads(line) for line in sink]
+
+
+def test_per_step_cap_resets_on_a_new_step(tmp_path):
+    log = EventLog(path=str(tmp_path / "events.jsonl"), max_per_step=2)
+    for step in (1, 2):
+        for index in range(5):
+            log.emit(step, "conversion", index=index)
+        log.emit(step, "correction")
+    steps = [(event["step"], event["event"]) for event in log.buffer]
+    # Each kind gets its own cap, and the cap starts over every step
+    assert steps == [(1, "conversion")] * 2 + [(1, "correction")] + [(2, "conversion")] * 2 + [(2, "correction")]
+    assert [event["index"] for event in log.buffer if event["event"] == "conversion"] == [0, 1, 0, 1]
+    assert log.dropped == {"conversion": 6}
+
+
+def sampled_steps(path, seed, events=4000):
+    # A buffer large enough that nothing is flushed
+    log = EventLog(path=str(path), sample_rates={"conversion": 0.25}, seed=seed, buffer_size=2 * events + 1)
+    for step in range(events):
+        log.emit(step, "conversion")
+        log.emit(step, "correction")
+    return log, [event["step"] for event in log.buffer if event["event"] == "conversion"]
+
+
+def test_sampling_keeps_the_configured_fraction(tmp_path):
+    path = tmp_path / "events.jsonl"
+    log, kept = sampled_steps(path, seed=11)
+    assert abs(len(kept) / 4000 - 0.25) < 0.03
+    assert log.dropped == {"conversion": 4000 - len(kept)}
+    # Kinds without a rate are all kept
+    assert sum(event["event"] == "correction" for event in log.buffer) == 4000
+    # The same seed samples the same events
+    assert sampled_steps(path, seed=11)[1] == kept
+    assert sampled_steps(path, seed=12)[1] != kept
+
+
+def test_close_writes_the_dropped_summary(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path=path, max_per_step=1, buffer_size=2)
+    for step in range(3):
+        log.emit(step, "conversion")
+        log.emit(step, "conversion")
+    log.close()
+    events = read_events(path)
+    assert [event["event"] for event in events] == ["conversion"] * 3 + ["dropped"]
+    assert events[-1] == {"step": 2, "event": "dropped", "counts": {"conversion": 3}}
+
+    # Without drops there is no summary
+    clean_path = str(tmp_path / "clean.jsonl")
+    clean = EventLog(path=clean_path)
+    clean.emit(0, "conversion")
+    clean.close()
+    assert [event["event"] for event in read_events(clean_path)] == ["conversion"]
@@ -0,0 +1,31 @@
+# tests/test_network.py
+
+import numpy as np
+import pytest
+
+from misinformation_model import MisinformationModel
+from network import small_world_network
+
+
+def test_one_agent_per_node_by_default():
+    network = small_world_network(500, rng=1)
+    model = MisinformationModel(network=network, seed=1)
+    assert model.num_agents == 500
+    assert sorted(agent.pos for agent in model.schedule.agents) == list(range(500))
+
+
+def test_mismatched_agent_count_is_rejected():
+    with pytest.raises(ValueError, match="500 nodes"):
+        MisinformationModel(num_agents=100, network=small_world_network(500, rng=1))
+
+
+@pytest.mark.parametrize("engine", ["agent", "vectorized"])
+def test_node_counts_follow_beliefs(engine):
+    model = MisinformationModel(network=small_world_network(200, rng=2), engine=engine, seed=2, stopping=None)
+    for _ in range(5):
+        model.step()
+    expected = np.zeros(200, dtype=np.int64)
+    for agent in model.schedule.agents:
+        expected[agent.pos] += agent.believes_misinformation
+    assert np.array_equal(model.grid.misinformed_counts, expected)
+    assert model.tallies.misinformed == expected.sum()
@@ -0,0 +1,37 @@
+# tests/test_population.py
+
+import pytest
+
+from agent import AGENT_CLASSES
+from checkpoint import _agent_fields
+from misinformation_model import MisinformationModel
+
+SCENARIOS = ["natural", "fact_checkers", "influencers", "echo_chamber", "political"]
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_bulk_agents_match_constructed_agents(scenario):
+    model = MisinformationModel(scenario=scenario, population="bulk", seed=4)
+    for agent in model.schedule.agents:
+        built = AGENT_CLASSES[agent.agent_type](
+            agent.unique_id, model, agent.agent_type, agent.critical_thinking, agent.believes_misinformation
+        )
+        # The side and cluster come from the population, not the constructor
+        expected, actual = _agent_fields(built), _agent_fields(agent)
+        for name in ("_political_side", "cluster_center"):
+            if name in expected:
+                del expected[name]
+                assert actual.pop(name) is not None
+        assert actual == expected
+        assert type(agent) is type(built) and agent._tallied and agent.model is model
+
+
+@pytest.mark.parametrize("population", ["sequential", "bulk"])
+def test_populations_are_counted_and_placed(population):
+    model = MisinformationModel(scenario="influencers", population=population, seed=4)
+    agents = model.schedule.agents
+    assert all(agent._tallied for agent in agents)
+    assert sum(len(cell) for cell in model.grid._cells) == len(agents) == model.tallies.agents
+    assert int(model.grid.agent_counts.sum()) == len(agents)
+    assert int(model.grid.misinformed_counts.sum()) == model.tallies.misinformed
+    assert model._queued_agents is None
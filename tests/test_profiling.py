@@ -0,0 +1,31 @@
+# tests/test_profiling.py
+
+import gc
+
+import profiling
+from agent import UserAgent
+from misinformation_model import MisinformationModel
+
+
+def test_collected_profilers_uninstall_the_wrappers():
+    gc.collect()  # Profiled models from other tests may still await collection
+    original = UserAgent.normal_step
+    models = [MisinformationModel(profile=True, seed=seed) for seed in range(3)]
+    for model in models:
+        model.step()
+    assert UserAgent.normal_step is not original
+    del model, models
+    gc.collect()
+    assert len(profiling._enabled) == 0
+    assert UserAgent.normal_step is original
+
+
+def test_disable_restores_the_original_methods():
+    gc.collect()
+    original = UserAgent.normal_step
+    model = MisinformationModel(profile=True, seed=1)
+    model.step()
+    assert model.profiler.get_step_dataframe()["calls"].sum() > 0
+    model.profiler.disable()
+    assert model.profiler is None
+    assert UserAgent.normal_step is original
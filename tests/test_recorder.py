@@ -0,0 +1,43 @@
+# tests/test_recorder.py
+
+import numpy as np
+
+from misinformation_model import MisinformationModel
+from recorder import SeriesRecorder, rows_since
+
+
+def stored_rows(path):
+    """The Misinformed column from every chunk on disk, in order"""
+    chunks = []
+    for chunk in sorted(path.glob("chunk_*.npz")):
+        with np.load(chunk) as stored:
+            chunks.append(stored["Misinformed"])
+    return np.concatenate(chunks) if chunks else np.zeros(0)
+
+
+def test_short_run_reaches_disk(tmp_path):
+    model = MisinformationModel(seed=1, record_to=str(tmp_path), stopping=None)
+    for _ in range(10):
+        model.step()
+    model.flush()
+    assert list(stored_rows(tmp_path)) == list(rows_since(model.datacollector, 0)["Misinformed"])
+
+
+def test_final_partial_chunk_is_flushed_on_stop(tmp_path):
+    model = MisinformationModel(seed=1, record_to=str(tmp_path), stopping=None)
+    model.datacollector.chunk_size = 4
+    for _ in range(10):
+        model.step()
+    model.stop("test")
+    assert len(stored_rows(tmp_path)) == 10
+
+
+def test_rows_since_matches_datacollector():
+    recorded = MisinformationModel(seed=3, record_to=None, stopping=None)
+    recorded.datacollector = SeriesRecorder(recorded.datacollector.model_reporters, buffer_size=8, chunk_size=8)
+    plain = MisinformationModel(seed=3, stopping=None)
+    for _ in range(6):
+        recorded.step()
+        plain.step()
+    for name, values in rows_since(plain.datacollector, 2).items():
+        assert np.array_equal(rows_since(recorded.datacollector, 2)[name], values)
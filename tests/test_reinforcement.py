@@ -0,0 +1,53 @@
+# tests/test_reinforcement.py
+
+import random
+
+import pytest
+
+from agent import EchoChamberAgent
+from misinformation_model import MisinformationModel
+
+
+def immediate_updates(reinforcers):
+    """Per-agent (belief_strength, critical_thinking) after each reinforcer
+    updates its similar neighbors one at a time, as the immediate mode does"""
+    state = {}
+    for reinforcer in reinforcers:
+        for neighbor in reinforcer.get_similar_neighbors():
+            if neighbor.agent_type != "echo_chamber":
+                continue
+            strength, critical_thinking = state.get(
+                neighbor.unique_id, (neighbor.belief_strength, neighbor.critical_thinking)
+            )
+            state[neighbor.unique_id] = (
+                min(1.0, strength + EchoChamberAgent.belief_reinforcement * 0.7),
+                max(0.1, critical_thinking - 0.05),
+            )
+    return state
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_batched_matches_immediate(seed):
+    model = MisinformationModel(scenario="echo_chamber", reinforcement="batched", seed=seed)
+    rng = random.Random(seed)
+    agents = list(model.schedule.agents)
+    # Start some agents at the bounds so the clamps are exercised
+    for agent in agents:
+        if agent.agent_type == "echo_chamber" and rng.random() < 0.3:
+            agent.belief_strength = rng.choice([0.95, 1.0])
+            agent.critical_thinking = rng.choice([0.1, 0.12])
+    reinforcers = [agent for agent in agents if agent.agent_type == "echo_chamber" and rng.random() < 0.5]
+    expected = immediate_updates(reinforcers)
+    assert any(strength == 1.0 for strength, _ in expected.values())
+    assert any(critical_thinking == 0.1 for _, critical_thinking in expected.values())
+
+    before = {agent.unique_id: (agent.belief_strength, agent.critical_thinking) for agent in agents}
+    for reinforcer in reinforcers:
+        model.reinforcement.add(reinforcer)
+    model.reinforcement.apply()
+    for agent in agents:
+        strength, critical_thinking = expected.get(agent.unique_id, before[agent.unique_id])
+        assert agent.belief_strength == pytest.approx(strength)
+        assert agent.critical_thinking == pytest.approx(critical_thinking)
+    assert model.tallies.critical_thinking == pytest.approx(sum(a.critical_thinking for a in agents))
+    assert not model.reinforcement.pending and not model.reinforcement.reinforcers.any()
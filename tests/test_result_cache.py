@@ -0,0 +1,88 @@
+# tests/test_result_cache.py
+
+import os
+
+import pandas as pd
+
+from result_cache import SOURCE_MODULES, ResultCache, source_fingerprint
+
+PARAMS = {"scenario": "fact_checkers"}  # Seed 20 stops at step 7
+
+
+def fresh_run(tmp_path, name, seed, steps, params=PARAMS):
+    return ResultCache(str(tmp_path / name)).run(params, seed, steps)
+
+
+def test_key_follows_params_seed_and_source(tmp_path):
+    cache = ResultCache(str(tmp_path), fingerprint="a")
+    key = cache.key(PARAMS, 1)
+    assert key == ResultCache(str(tmp_path), fingerprint="a").key(dict(PARAMS), 1)
+    assert key != ResultCache(str(tmp_path), fingerprint="b").key(PARAMS, 1)
+    assert key != cache.key(PARAMS, 2)
+    assert key != cache.key({"scenario": "natural"}, 1)
+    assert source_fingerprint() == source_fingerprint()
+    assert source_fingerprint() != source_fingerprint(SOURCE_MODULES[:-1])
+
+
+def test_source_change_misses(tmp_path):
+    ResultCache(str(tmp_path), fingerprint="a").run(PARAMS, 20, 5)
+    changed = ResultCache(str(tmp_path), fingerprint="b")
+    assert changed.get(PARAMS, 20, 5) is None
+    assert changed.misses == 1
+
+
+def test_prefix_hits_match_fresh_runs(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    full = cache.run(PARAMS, 20, 100)
+    assert full.attrs == {"stop_reason": "no_misinformed_agents", "stop_step": 7}
+    for steps in (2, 6, 7, 50):
+        cached = cache.get(PARAMS, 20, steps)
+        fresh = fresh_run(tmp_path, f"fresh{steps}", 20, steps)
+        pd.testing.assert_frame_equal(cached, fresh)
+        # Only a prefix that reaches the stop carries the stop reason
+        assert cached.attrs == fresh.attrs
+    assert cache.hits == 4 and cache.misses == 1
+
+
+def test_longer_request_than_a_running_entry_misses(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.run(PARAMS, 20, 3)
+    assert cache.get(PARAMS, 20, 5) is None
+    assert len(cache.run(PARAMS, 20, 5)) == 5
+    assert len(cache.get(PARAMS, 20, 5)) == 5
+
+
+def entry_names(tmp_path):
+    return sorted(name for name in os.listdir(tmp_path) if name.endswith(".npz"))
+
+
+def test_least_recently_used_entries_go_first(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    params = {"num_agents": 10}
+    keys = {}
+    for age, seed in enumerate((20, 22, 23)):
+        cache.run(params, seed, 10)
+        keys[seed] = cache.key(params, seed) + ".npz"
+        # Oldest first, one minute apart
+        when = 1_000_000 + 60 * age
+        os.utime(tmp_path / keys[seed], (when, when))
+    sizes = {seed: os.path.getsize(tmp_path / name) for seed, name in keys.items()}
+
+    # A hit makes seed 20 the most recently used, so seed 22 is evicted next
+    cache.get(params, 20, 10)
+    cache.max_bytes = sizes[20] + sizes[23] + 1
+    cache.evict()
+    assert entry_names(tmp_path) == sorted([keys[20], keys[23]])
+
+    # A new entry pushes out the least recently used one, not itself
+    cache.run(params, 25, 10)
+    assert keys[23] not in entry_names(tmp_path)
+    assert cache.key(params, 25) + ".npz" in entry_names(tmp_path)
+
+
+def test_entry_larger_than_the_cache_is_kept(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1)
+    cache.run(PARAMS, 20, 5)
+    assert entry_names(tmp_path) == [cache.key(PARAMS, 20) + ".npz"]
+    assert cache.get(PARAMS, 20, 5) is not None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
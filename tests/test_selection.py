@@ -0,0 +1,39 @@
+# tests/test_selection.py
+
+import heapq
+import random
+from itertools import islice
+
+import pytest
+
+from selection import by_priority
+
+
+class Candidate:
+    def __init__(self, name, score):
+        self.name = name
+        self.score = score
+
+
+@pytest.mark.parametrize("highest_first", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_stable_sort_with_ties(highest_first, seed):
+    rng = random.Random(seed)
+    # Few distinct scores, so most candidates tie with others
+    candidates = [Candidate(i, rng.choice([0.1, 0.5, 0.5, 0.9, 1.0])) for i in range(40)]
+    expected = sorted(candidates, key=lambda c: c.score, reverse=highest_first)
+    assert list(by_priority(candidates, lambda c: c.score, highest_first)) == expected
+
+
+def test_stopping_early_skips_the_rest(monkeypatch):
+    candidates = [Candidate(i, i % 7) for i in range(100)]
+    pops = []
+    original = heapq.heappop
+    monkeypatch.setattr(heapq, "heappop", lambda heap: pops.append(1) or original(heap))
+    first = list(islice(by_priority(candidates, lambda c: c.score, highest_first=True), 3))
+    assert first == sorted(candidates, key=lambda c: c.score, reverse=True)[:3]
+    assert len(pops) == 3
+
+
+def test_empty():
+    assert list(by_priority([], lambda c: c.score)) == []
@@ -0,0 +1,32 @@
+# tests/test_sim_worker.py
+
+import time
+
+import numpy as np
+import pytest
+
+from misinformation_model import MisinformationModel
+from recorder import rows_since
+from sim_worker import SimulationWorker
+
+
+@pytest.mark.parametrize("recorded", [False, True])
+def test_slow_consumer_gets_every_row_and_the_final_snapshot(tmp_path, recorded):
+    model = MisinformationModel(10, 10, 100, 10, "influencers", seed=5, record_to=str(tmp_path) if recorded else None)
+    worker = SimulationWorker(model, queue_size=1, publish_interval=0, max_steps=300)
+    worker.start()
+    snapshots = []
+    while not (snapshots and snapshots[-1]["done"]):
+        snapshots.append(worker.snapshots.get(timeout=30))
+        time.sleep(0.005)
+    worker.join(timeout=30)
+    assert not worker.is_alive()
+
+    assert [s["done"] for s in snapshots].count(True) == 1
+    assert snapshots[-1]["step"] == model.step_count == 300
+    # The full queue made the worker hold rows back and send them later
+    assert len(snapshots) < model.step_count
+    expected = rows_since(model.datacollector, 0)
+    for name, column in expected.items():
+        received = np.concatenate([s["rows"][name] for s in snapshots])
+        np.testing.assert_array_equal(received, column)
@@ -0,0 +1,60 @@
+# tests/test_sweep.py
+
+import json
+import os
+
+from sweep import MANIFEST, build_runs, completed_runs, run_sweep
+
+
+def sweep_runs():
+    return build_runs(["natural"], [30], [5], [(8, 8)], replicates=4, base_seed=7)
+
+
+def read_csvs(out_dir):
+    runs = os.path.join(out_dir, "runs")
+    return {name: open(os.path.join(runs, name), "rb").read() for name in os.listdir(runs) if name.endswith(".csv")}
+
+
+def test_completed_runs_skips_a_truncated_line(tmp_path):
+    with open(tmp_path / MANIFEST, "w") as manifest:
+        manifest.write(json.dumps({"run_id": "a"}) + "\n")
+        manifest.write(json.dumps({"run_id": "b"}) + "\n")
+        manifest.write('{"run_id": "c", "st')
+    assert completed_runs(str(tmp_path)) == {"a", "b"}
+    assert completed_runs(str(tmp_path / "missing")) == set()
+
+
+def test_interrupted_sweep_resumes_with_only_the_missing_runs(tmp_path):
+    out_dir = str(tmp_path)
+    runs = sweep_runs()
+    assert run_sweep(runs, 5, out_dir, workers=1) == len(runs)
+    assert completed_runs(out_dir) == {run["run_id"] for run in runs}
+    finished = read_csvs(out_dir)
+
+    # Interrupt the sweep: the last two runs lose their manifest lines, one
+    # mid-write, and one of them also left its temporary table behind
+    with open(os.path.join(out_dir, MANIFEST)) as manifest:
+        lines = manifest.readlines()
+    kept, lost = lines[:2], lines[2:]
+    with open(os.path.join(out_dir, MANIFEST), "w") as manifest:
+        manifest.writelines(kept)
+        manifest.write(lost[0][:len(lost[0]) // 2])
+    lost_ids = {json.loads(line)["run_id"] for line in lost}
+    stale = os.path.join(out_dir, "runs", sorted(lost_ids)[0] + ".csv")
+    os.remove(stale)
+    with open(stale + ".tmp", "w") as partial:
+        partial.write("Step,Misinf")
+    kept_times = {
+        name: os.stat(os.path.join(out_dir, "runs", name)).st_mtime_ns
+        for name in finished if name[:-len(".csv")] not in lost_ids
+    }
+
+    assert run_sweep(runs, 5, out_dir, workers=1) == len(lost_ids)
+    assert completed_runs(out_dir) == {run["run_id"] for run in runs}
+    # Rerun tables match the first sweep, and finished ones were not rewritten
+    assert read_csvs(out_dir) == finished
+    assert not os.path.exists(stale + ".tmp")
+    for name, mtime in kept_times.items():
+        assert os.stat(os.path.join(out_dir, "runs", name)).st_mtime_ns == mtime
+    # Nothing left to do
+    assert run_sweep(runs, 5, out_dir, workers=1) == 0
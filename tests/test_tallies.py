@@ -0,0 +1,48 @@
+# tests/test_tallies.py
+
+from collections import Counter
+
+import pytest
+
+from misinformation_model import MisinformationModel
+
+SCENARIOS = ["natural", "fact_checkers", "influencers", "echo_chamber", "political"]
+
+
+def assert_tallies_match_agents(model):
+    agents = model.schedule.agents
+    tallies = model.tallies
+    assert tallies.agents == len(agents)
+    assert tallies.misinformed == sum(a.believes_misinformation for a in agents)
+    assert tallies.types == Counter(a.agent_type for a in agents)
+    assert +tallies.political_sides == Counter(a.political_side for a in agents if a.agent_type == "political")
+    assert tallies.total_influence == pytest.approx(
+        sum(a.influence_count for a in agents if a.agent_type == "influencer")
+    )
+    assert tallies.critical_thinking == pytest.approx(sum(a.critical_thinking for a in agents))
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+@pytest.mark.parametrize("activation", ["random", "staged", "simultaneous"])
+def test_tallies_follow_agents(scenario, activation):
+    model = MisinformationModel(scenario=scenario, activation=activation, seed=5)
+    assert_tallies_match_agents(model)
+    for _ in range(15):
+        model.step()
+        assert_tallies_match_agents(model)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_bulk_population_tallies(scenario):
+    model = MisinformationModel(scenario=scenario, population="bulk", seed=5)
+    assert_tallies_match_agents(model)
+    for _ in range(5):
+        model.step()
+    assert_tallies_match_agents(model)
+
+
+def test_vectorized_engine_tallies():
+    model = MisinformationModel(engine="vectorized", num_agents=400, width=20, height=20, seed=5)
+    for _ in range(15):
+        model.step()
+        assert_tallies_match_agents(model)
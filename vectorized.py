@@ -0,0 +1,145 @@
+# vectorized.py
+
+import numpy as np
+
+
+def wrapped_offsets(width, height, radius=1, include_center=False):
+    """Return the distinct (dx, dy) offsets of a Moore neighborhood on a torus.
+
+    Offsets that land on the same cell once wrapped (small grids) are only
+    returned once, matching MultiGrid.get_neighborhood on a torus.
+    """
+    seen = set()
+    offsets = []
+    for dx in range(-radius, radius + 1):
+        for dy in range(-radius, radius + 1):
+            cell = (dx % width, dy % height)
+            if cell in seen:
+                continue
+            seen.add(cell)
+            if cell == (0, 0) and not include_center:
+                continue
+            offsets.append((dx, dy))
+    return offsets
+
+
+def neighborhood_sum(field, offsets):
+    """Sum a (width, height) field over the given offsets for every cell at once"""
+    total = np.zeros_like(field)
+    for dx, dy in offsets:
+        # Rolling by -d brings the value of cell (x + dx, y + dy) to (x, y)
+        total += np.roll(field, shift=(-dx, -dy), axis=(0, 1))
+    return total
+
+
+class NaturalSpreadEngine:
+    """Array-backed replacement for UserAgent.normal_step.
+
+    Keeps critical thinking, beliefs and cell positions of every agent in
+    NumPy arrays and updates the whole population with one RNG draw per step.
+
+    RandomActivation lets agents react to flips made earlier in the same step.
+    To keep the spread dynamics of the per-agent path, each step visits agents
+    in a random order split into `batches` groups; every group is updated at
+    once and its flips are pushed into the neighbor counts before the next
+    group runs. The two paths agree statistically rather than draw for draw.
+    With the model's counter-based RNG the update is synchronous instead and
+    matches simultaneous per-agent activation exactly.
+    """
+
+    name = "vectorized"
+
+    def __init__(self, model, batches=32):
+        self.model = model
+        self.batches = batches
+        self.agents = list(model.schedule.agents)
+        for agent in self.agents:
+            if agent.agent_type != "normal":
+                raise ValueError("The vectorized engine only supports normal agents")
+
+        n = len(self.agents)
+        self.critical_thinking = np.fromiter((a.critical_thinking for a in self.agents), dtype=float, count=n)
+        self.believes_misinformation = np.fromiter((a.believes_misinformation for a in self.agents), dtype=bool, count=n)
+        self.unique_ids = np.fromiter((a.unique_id for a in self.agents), dtype=np.int64, count=n)
+        self.cell = self.setup_space()
+        # Normal agents never move, so neighbor totals are fixed for the whole run
+        self.total_neighbors = self.neighbor_field(np.ones(n, dtype=np.int64))[self.cell]
+
+        # Seed from the model RNG so a seeded model stays reproducible
+        self.rng = np.random.default_rng(model.random.getrandbits(64))
+
+    def setup_space(self):
+        """Read the agents' positions; returns each agent's flat cell index"""
+        self.width = self.model.grid.width
+        self.height = self.model.grid.height
+        n = len(self.agents)
+        self.x = np.fromiter((a.pos[0] for a in self.agents), dtype=np.intp, count=n)
+        self.y = np.fromiter((a.pos[1] for a in self.agents), dtype=np.intp, count=n)
+        self.offsets = wrapped_offsets(self.width, self.height)
+        return self.x * self.height + self.y
+
+    def cell_counts(self, weights):
+        """Per-cell totals of an agent-aligned array, shaped (width, height)"""
+        counts = np.bincount(self.cell, weights=weights, minlength=self.width * self.height)
+        return counts.astype(np.int64).reshape(self.width, self.height)
+
+    def neighbor_field(self, weights):
+        """Neighborhood totals of an agent-aligned array for every cell,
+        flattened the same way as self.cell"""
+        return neighborhood_sum(self.cell_counts(weights), self.offsets).ravel()
+
+    def step(self):
+        """Apply one natural-spread step to every agent"""
+        n = len(self.agents)
+        believes = self.believes_misinformation
+        misinformed_field = self.neighbor_field(believes)
+
+        if self.model.counter_rng is not None:
+            # Counter-based draws are each agent's first draw of the step, as
+            # in normal_step, and make the update order-independent, so the
+            # whole population is updated at once
+            transition_draw = self.model.counter_rng.uniforms(self.model.step_count, self.unique_ids)
+            batches = [np.arange(n)]
+        else:
+            # A single draw per step provides both the activation order and
+            # the transition uniforms
+            draw = self.rng.random((2, n))
+            transition_draw = draw[1]
+            batches = np.array_split(np.argsort(draw[0]), min(self.batches, n) or 1)
+
+        changed = np.zeros(n, dtype=bool)
+        for batch in batches:
+            flipped = self.update_batch(batch, transition_draw[batch], misinformed_field)
+            if len(flipped):
+                changed[flipped] = True
+                self.spread_changes(flipped, misinformed_field)
+        self.sync_agents(np.flatnonzero(changed))
+
+    def update_batch(self, batch, draw, misinformed_field):
+        """Apply the transition rule to one batch; return the flipped indices"""
+        believes = self.believes_misinformation[batch]
+        critical_thinking = self.critical_thinking[batch]
+        misinformation_count = misinformed_field[self.cell[batch]]
+        total = self.total_neighbors[batch]
+        informed_count = total - misinformation_count
+
+        chance = np.divide(misinformation_count, total, out=np.zeros(len(batch)), where=total > 0)
+        adopt = ~believes & (draw < chance * (1 - critical_thinking))
+        reject = believes & (informed_count > misinformation_count) & (draw < critical_thinking)
+
+        flipped = batch[adopt | reject]
+        self.believes_misinformation[flipped] ^= True
+        return flipped
+
+    def spread_changes(self, flipped, misinformed_field):
+        """Update neighbor believer counts around agents whose belief flipped"""
+        delta = np.where(self.believes_misinformation[flipped], 1, -1)
+        for dx, dy in self.offsets:
+            # The agent at (x, y) is a neighbor of the cell at (x - dx, y - dy)
+            cells = ((self.x[flipped] - dx) % self.width) * self.height + (self.y[flipped] - dy) % self.height
+            np.add.at(misinformed_field, cells, delta)
+
+    def sync_agents(self, indices):
+        """Copy the array state back onto the given agent objects"""
+        for i in indices:
+            self.agents[i].believes_misinformation = bool(self.believes_misinformation[i])
@@ -1,10 +1,36 @@
+import itertools
+
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.animation import FuncAnimation
+from matplotlib.colors import to_rgba
+
+# Color categories; political agents are split by side
+CATEGORIES = ['normal', 'fact_checker', 'influencer', 'echo_chamber',
+              'political_left', 'political_right', 'political_neutral']
+SIZES = {'fact_checker': 100, 'influencer': 120, 'political': 110}
+DEFAULT_SIZE = 80
+ALPHA = 0.6
 
 class Visualization:
-    def __init__(self, model):
+    """Scatter view of the model's agents, drawn from preallocated arrays.
+
+    Positions, color indices and sizes live in NumPy arrays that are refilled
+    in place each frame. Colors come from an RGBA palette holding every
+    category plus its darkened (misinformed) variant, and the title counts
+    come from the model's tallies. Use animate() to run it with blitting.
+
+    Above `raster_above` agents, markers are replaced by an image with one
+    pixel per cell (the last agent in a cell sets its color), since drawing
+    that many scatter markers cannot keep up.
+    """
+
+    def __init__(self, model, raster_above=20000):
         self.model = model
+        self.raster_above = raster_above
         self.fig, self.ax = plt.subplots(figsize=(10, 8))
         self.scatter = None
+        self.image = None
         self.colors = {
             'normal': 'blue',
             'fact_checker': 'green',
@@ -23,73 +49,100 @@ class Visualization:
             plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='darkblue', markersize=10, label='Political (Right)'),
             plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='gray', markersize=10, label='Political (Neutral)')
         ]
+        # Rows 0..k-1 are the base colors, rows k..2k-1 their darkened variants
+        base = [to_rgba(self.colors[category], ALPHA) for category in CATEGORIES]
+        self.palette = np.array(base + [self.darken_color(color) for color in base])
+        self.agents = []
+
+        # Blitting needs fixed limits; agents sit on integer cell coordinates
+        self.ax.set_xlim(-0.5, model.grid.width - 0.5)
+        self.ax.set_ylim(-0.5, model.grid.height - 0.5)
+        self.stats_text = self.ax.text(0.5, 1.01, '', transform=self.ax.transAxes, ha='center', va='bottom', animated=True)
+
+    def darken_color(self, color, factor=0.6):
+        """RGBA color with its RGB channels scaled down, keeping alpha"""
+        r, g, b, a = to_rgba(color)
+        return (r * factor, g * factor, b * factor, a)
+
+    def allocate(self):
+        """Size the arrays for the current agents and fill the fixed columns"""
+        self.agents = list(self.model.schedule.agents)
+        n = len(self.agents)
+        self.offsets = np.zeros((n, 2))
+        self.believes = np.zeros(n, dtype=bool)
+        self.color_index = np.zeros(n, dtype=np.intp)
+        self.facecolors = np.zeros((n, 4))
+        types = [agent.agent_type for agent in self.agents]
+        self.sizes = np.array([SIZES.get(agent_type, DEFAULT_SIZE) for agent_type in types], dtype=float)
+        self.category = np.array(
+            [CATEGORIES.index(agent_type) if agent_type != 'political' else 0 for agent_type in types], dtype=np.intp
+        )
+        # Only political agents change category, when they switch sides
+        self.political = np.array([i for i, agent_type in enumerate(types) if agent_type == 'political'], dtype=np.intp)
+
+    def refresh(self):
+        """Refill positions and colors in place from the agents"""
+        agents = self.agents
+        n = len(agents)
+        self.offsets.reshape(-1)[:] = np.fromiter(
+            itertools.chain.from_iterable(agent.pos for agent in agents), dtype=float, count=2 * n
+        )
+        self.believes[:] = np.fromiter((agent.believes_misinformation for agent in agents), dtype=bool, count=n)
+        for i in self.political.tolist():
+            self.category[i] = CATEGORIES.index('political_' + (agents[i].political_side or 'neutral'))
+        np.add(self.category, self.believes * len(CATEGORIES), out=self.color_index)
+        np.take(self.palette, self.color_index, axis=0, out=self.facecolors)
 
     def update(self, frame):
         self.model.step()
-        
-        # Update agent positions and colors
-        positions = []
-        colors = []
-        sizes = []
-        
-        for agent in self.model.schedule.agents:
-            positions.append(agent.pos)
-            
-            # Determine agent color based on type and state
-            if agent.agent_type == "political":
-                if agent.political_side == "left":
-                    color = self.colors['political_left']
-                elif agent.political_side == "right":
-                    color = self.colors['political_right']
-                else:
-                    color = self.colors['political_neutral']
-            else:
-                color = self.colors[agent.agent_type]
-            
-            # Make misinformed agents darker
-            if agent.believes_misinformation:
-                color = self.darken_color(color)
-            
-            colors.append(color)
-            
-            # Set size based on agent type
-            if agent.agent_type == "fact_checker":
-                size = 100
-            elif agent.agent_type == "influencer":
-                size = 120
-            elif agent.agent_type == "political":
-                size = 110
-            else:
-                size = 80
-            sizes.append(size)
-        
-        if self.scatter is None:
-            self.scatter = self.ax.scatter(
-                [p[0] for p in positions],
-                [p[1] for p in positions],
-                c=colors,
-                s=sizes,
-                alpha=0.6
-            )
+        if len(self.agents) != len(self.model.schedule.agents):
+            self.allocate()
+        self.refresh()
+
+        if len(self.agents) > self.raster_above:
+            artist = self.draw_raster()
         else:
-            self.scatter.set_offsets(positions)
-            self.scatter.set_color(colors)
-            self.scatter.set_sizes(sizes)
-        
+            artist = self.draw_scatter()
+
         # Update title with current statistics
-        misinformed_count = sum(1 for agent in self.model.schedule.agents if agent.believes_misinformation)
-        fact_checker_count = sum(1 for agent in self.model.schedule.agents if agent.agent_type == "fact_checker")
-        influencer_count = sum(1 for agent in self.model.schedule.agents if agent.agent_type == "influencer")
-        echo_chamber_count = sum(1 for agent in self.model.schedule.agents if agent.agent_type == "echo_chamber")
-        political_count = sum(1 for agent in self.model.schedule.agents if agent.agent_type == "political")
-        
-        self.ax.set_title(
+        tallies = self.model.tallies
+        self.stats_text.set_text(
             f'Step: {self.model.schedule.steps}\n'
-            f'Misinformed: {misinformed_count} | '
-            f'Fact Checkers: {fact_checker_count} | '
-            f'Influencers: {influencer_count} | '
-            f'Echo Chambers: {echo_chamber_count} | '
-            f'Political: {political_count}'
+            f'Misinformed: {tallies.misinformed} | '
+            f'Fact Checkers: {tallies.types["fact_checker"]} | '
+            f'Influencers: {tallies.types["influencer"]} | '
+            f'Echo Chambers: {tallies.types["echo_chamber"]} | '
+            f'Political: {tallies.types["political"]}'
         )
-        
-        return self.scatter, 
\ No newline at end of file
+
+        return artist, self.stats_text
+
+    def draw_scatter(self):
+        if self.scatter is None:
+            self.scatter = self.ax.scatter(
+                self.offsets[:, 0], self.offsets[:, 1], c=self.facecolors, s=self.sizes, linewidths=0, animated=True
+            )
+        else:
+            self.scatter.set_offsets(self.offsets)
+            self.scatter.set_facecolor(self.facecolors)
+            self.scatter.set_sizes(self.sizes)
+        return self.scatter
+
+    def draw_raster(self):
+        if self.image is None:
+            grid = self.model.grid
+            self.pixels = np.zeros((grid.height, grid.width, 4))
+            self.image = self.ax.imshow(
+                self.pixels, origin='lower', extent=(-0.5, grid.width - 0.5, -0.5, grid.height - 0.5),
+                interpolation='nearest', animated=True,
+            )
+        self.pixels.fill(0)
+        x, y = self.offsets.astype(np.intp).T
+        self.pixels[y, x] = self.facecolors
+        self.image.set_data(self.pixels)
+        return self.image
+
+    def animate(self, interval=50, frames=None):
+        """Run the view as a blitted animation; keep the returned object alive"""
+        self.ax.legend(handles=self.legend_elements, loc='upper right')
+        return FuncAnimation(self.fig, self.update, frames=frames, interval=interval, blit=True, cache_frame_data=False)